@@ -0,0 +1,94 @@
+# Adaptive polling rate driven by signal activity
+# Lightweight on purpose (stdlib only) so the headless CLI can use it.
+import time
+
+CHANGE_MM = 20  # movement that counts as activity
+MIN_INTERVAL = 0.02
+MAX_INTERVAL = 2.0
+BACKOFF = 2.0
+
+
+def frame_time(baud: int, request: int = 8, response: int = 13) -> float:
+    """Wire time of one read request/response pair, including the 3.5 character RTU gaps."""
+    return (request + response + 7) * 10 / baud
+
+
+class AdaptivePoller:
+    """Per-channel interval controller and scheduler for sensors on one bus.
+
+    Each channel keeps an ADM-style reference level (see the notebook): when a
+    reading moves ``change_mm`` away from it, or an external event fires via
+    ``trigger()``, the channel drops to its minimum interval and the reference
+    moves to the new reading. Quiet channels back off by ``backoff`` per poll
+    up to their maximum. A sensor is polled at the fastest interval any of its
+    channels asks for, and no poll is scheduled until ``bus_interval`` after
+    the previous one on the bus, whichever sensor it went to, so the
+    schedule never outruns what the bus can carry.
+    """
+
+    def __init__(self, min_interval: float = MIN_INTERVAL, max_interval: float = MAX_INTERVAL,
+                 change_mm: float = CHANGE_MM, backoff: float = BACKOFF, bus_interval: float = 0.0):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.change_mm = change_mm
+        self.backoff = backoff
+        self.bus_interval = bus_interval
+        self.channels = {}  # addr -> list of per-channel state dicts
+        self.due = {}  # addr -> monotonic time of next poll
+        self.bus_free = -float("inf")  # monotonic time the bus can take the next request
+
+    def add_sensor(self, addr: int, channels: int = 4) -> None:
+        self.channels[addr] = [{"interval": self.min_interval, "min": self.min_interval,
+                                "max": self.max_interval, "ref": None} for _ in range(channels)]
+        self.due[addr] = time.monotonic()
+
+    def set_limits(self, addr: int, channel: int, min_interval: float = None, max_interval: float = None) -> None:
+        state = self.channels[addr][channel]
+        if min_interval is not None:
+            state["min"] = min_interval
+        if max_interval is not None:
+            state["max"] = max_interval
+        state["interval"] = min(max(state["interval"], state["min"]), state["max"])
+
+    def trigger(self, addr: int, channel: int = None) -> None:
+        """External event (e.g. an alarm) on a sensor or one of its channels: poll it fast now."""
+        if addr not in self.channels:
+            self.add_sensor(addr)
+        states = self.channels[addr] if channel is None else [self.channels[addr][channel]]
+        for state in states:
+            state["interval"] = state["min"]
+        self.due[addr] = min(self.due[addr], time.monotonic() + self.interval(addr))
+
+    def interval(self, addr: int) -> float:
+        return max(min(state["interval"] for state in self.channels[addr]), self.bus_interval)
+
+    def observe(self, addr: int, values, now: float = None) -> float:
+        """Feed one poll result (None on timeout) and return the sensor's next interval."""
+        if addr not in self.channels:
+            self.add_sensor(addr, len(values) if values else 4)
+        now = time.monotonic() if now is None else now
+        for i, state in enumerate(self.channels[addr]):
+            value = values[i] if values else None
+            ref = state["ref"]
+            if (value is None) != (ref is None) or (value is not None and abs(value - ref) >= self.change_mm):
+                state["ref"] = value
+                state["interval"] = state["min"]
+            else:
+                state["interval"] = min(state["interval"] * self.backoff, state["max"])
+        interval = self.interval(addr)
+        self.due[addr] = now + interval
+        self.bus_free = max(self.bus_free, now + self.bus_interval)
+        return interval
+
+    def next_sensor(self, now: float = None):
+        """(addr, seconds to wait) for the sensor that is due first, held back while the bus is busy."""
+        now = time.monotonic() if now is None else now
+        addr = min(self.due, key=self.due.get)
+        return addr, max(self.due[addr] - now, self.bus_free - now, 0.0)
+
+    def wait_next(self) -> int:
+        """Sleep until the next sensor is due and return its address."""
+        addr, delay = self.next_sensor()
+        if delay > 0:
+            time.sleep(delay)
+        return addr
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+# dyp - headless command line entry point for DYP-E08 sensors
+#
+#   python dyp.py poll   -p /dev/ttyUSB0          one reading (or -n N readings)
+#   python dyp.py log    -p /dev/ttyUSB0 -d 600   CSV + pyramid logging, no GUI
+#   python dyp.py config -p /dev/ttyUSB0 --angle 2 --denoise 5
+#   python dyp.py scan   -p /dev/ttyUSB0          find responding addresses
+#   python dyp.py stream -p /dev/ttyUSB0 --plot   continuous output, optional live plot
+#   python dyp.py baud   -p /dev/ttyUSB0 --upgrade detect / raise the bus baud rate
+#   python dyp.py check  -p /dev/ttyUSB0 --addrs 1,2  register snapshot per sensor
+#   python dyp.py tune   --addrs 1,2 --target 500  sweep every connected bus
+#
+# Only argparse and the protocol helpers load at startup. numpy (pyramid),
+# matplotlib and Tk are imported inside the subcommands that need them, so a
+# cron or power-up job reaches the bus well inside STARTUP_BUDGET.
+import time
+
+T_START = time.perf_counter()
+
+import argparse
+import os
+import sys
+
+import dyp_protocol as proto
+
+STARTUP_BUDGET = 0.25  # seconds from entering dyp.py to the first frame on the bus
+
+
+def report_startup(args, waited: float = 0.0) -> None:
+    """Called right before the first request goes out; ``waited`` is deliberate idle time to leave out."""
+    elapsed = time.perf_counter() - T_START - waited
+    if args.timing or elapsed > STARTUP_BUDGET:
+        status = "within" if elapsed <= STARTUP_BUDGET else "OVER"
+        print(f"[STARTUP] first frame after {elapsed * 1000:.0f} ms ({status} {STARTUP_BUDGET * 1000:.0f} ms budget)",
+              file=sys.stderr)
+
+
+def make_poller(args):
+    if not args.adaptive:
+        return None
+    from adaptive_poll import AdaptivePoller, frame_time
+
+    poller = AdaptivePoller(args.min_interval, args.max_interval, args.change_mm,
+                            bus_interval=frame_time(args.baud))
+    poller.add_sensor(args.addr)
+    return poller
+
+
+def pace(poller, args, dists) -> None:
+    """Sleep until the next poll: fixed interval, or whatever the adaptive controller decides."""
+    if poller:
+        poller.observe(args.addr, dists)
+        poller.wait_next()
+    else:
+        time.sleep(args.interval)
+
+
+def make_alarms(args, poller):
+    if args.alarm is None:
+        return None
+    from dyp_alarm import AlarmEngine, channel_rules, udp_hook
+
+    engine = AlarmEngine(channel_rules(args.alarm, args.hysteresis, args.debounce), budget=args.interval)
+    engine.on(lambda e: print(f"[ALARM] {e['rule']}: {e['state']} at {e['distance']} mm "
+                              f"({e['latency'] * 1000:.1f} ms after sample)", file=sys.stderr))
+    if args.alarm_udp:
+        engine.on(udp_hook(*args.alarm_udp))
+    if poller:
+        # only an approaching object needs the fast rate; a clear lets it decay
+        engine.on(lambda e: e["state"] == "alarm" and poller.trigger(args.addr, e["channel"] - 1))
+    return engine
+
+
+def report_alarms(args, alarms) -> None:
+    if alarms and args.timing:
+        print(f"[ALARM] latency {alarms.latency_stats()}", file=sys.stderr)
+
+
+def format_row(stamp: str, dists) -> str:
+    if dists is None:
+        return f"{stamp}  " + "  ".join("  ---" for _ in proto.CHANNEL_LABELS)
+    return f"{stamp}  " + "  ".join(f"{d:5d}" for d in dists)
+
+
+# --- Subcommands ---
+
+def cmd_poll(args) -> int:
+    with proto.open_port(args.port, args.baud) as ser:
+        report_startup(args)
+        poller = make_poller(args)
+        clock = proto.SampleClock()
+        misses = 0
+        for i in range(args.count):
+            t, dists = proto.read_distances_stamped(ser, args.addr)
+            misses += dists is None
+            print(format_row(clock.stamp(t), dists))
+            if i + 1 < args.count:
+                pace(poller, args, dists)
+    return 1 if misses == args.count else 0
+
+
+def cmd_log(args) -> int:
+    import csv
+    from datetime import datetime
+    from log_pyramid import PyramidWriter
+
+    log_name = os.path.join(args.out, f"sensor_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
+    with proto.open_port(args.port, args.baud) as ser, open(log_name, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Time"] + proto.CHANNEL_LABELS)
+        pyramid = PyramidWriter(log_name, proto.CHANNEL_LABELS)
+        poller = make_poller(args)
+        alarms = make_alarms(args, poller)
+        report_startup(args)
+        print(f"Logging to {log_name} (Ctrl+C to stop)", file=sys.stderr)
+        clock = proto.SampleClock()
+        try:
+            while args.duration <= 0 or clock.elapsed(time.monotonic()) < args.duration:
+                t, dists = proto.read_distances_stamped(ser, args.addr)
+                if alarms:
+                    alarms.evaluate(t, dists)
+                # 0 = timeout, same as the GUIs; empty cells are reserved for inactive channels
+                row = [clock.stamp(t)] + (dists if dists else [0] * len(proto.CHANNEL_LABELS))
+                writer.writerow(row)
+                f.flush()
+                pyramid.append(clock.elapsed(t), row[1:])
+                pyramid.flush()
+                pace(poller, args, dists)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            pyramid.close()
+            report_alarms(args, alarms)
+    return 0
+
+
+def cmd_config(args) -> int:
+    waited = 0.0
+    if args.wait_powerup > 0:
+        print(f"Power ON the sensor now. Writing config in {args.wait_powerup} s...", file=sys.stderr)
+        t0 = time.perf_counter()
+        time.sleep(args.wait_powerup)
+        waited = time.perf_counter() - t0
+    with proto.open_port(args.port, args.baud, timeout=0.5) as ser:
+        report_startup(args, waited)
+        ok = True
+        for addr in args.addrs:
+            good = proto.write_settings(ser, addr, args.angle, args.denoise)
+            print(f"{'✅' if good else '❌'} Sensor {addr:#04x}: angle={args.angle} denoise={args.denoise}")
+            ok = ok and good
+    return 0 if ok else 1
+
+
+def cmd_scan(args) -> int:
+    if args.list_ports:
+        for device in proto.list_ports():
+            print(device)
+        return 0
+    found = []
+    with proto.open_port(args.port, args.baud, timeout=args.timeout) as ser:
+        report_startup(args)
+        for addr in range(args.first, args.last + 1):
+            vals = proto.read_registers(ser, addr, proto.REG_ADDRESS, 1)
+            if vals is not None:
+                found.append(addr)
+                print(f"✅ {addr:#04x} responded (address register = {vals[0]:#06x})")
+    if not found:
+        print(f"❌ No sensors answered on {args.port} @ {args.baud}")
+    return 0 if found else 1
+
+
+def cmd_stream(args) -> int:
+    with proto.open_port(args.port, args.baud) as ser:
+        report_startup(args)
+        if args.plot:
+            return stream_plot(ser, args)
+        poller = make_poller(args)
+        alarms = make_alarms(args, poller)
+        clock = proto.SampleClock()
+        try:
+            while True:
+                t, dists = proto.read_distances_stamped(ser, args.addr)
+                if alarms:
+                    alarms.evaluate(t, dists)
+                print(format_row(clock.stamp(t), dists), flush=True)
+                pace(poller, args, dists)
+        except (KeyboardInterrupt, BrokenPipeError):
+            report_alarms(args, alarms)
+            return 0
+
+
+def stream_plot(ser, args) -> int:
+    from collections import deque
+    import matplotlib.pyplot as plt
+    import matplotlib.animation as animation
+
+    history = {label: deque(maxlen=args.history) for label in proto.CHANNEL_LABELS}
+    fig, ax = plt.subplots()
+    lines = {label: ax.plot([], [], label=label)[0] for label in proto.CHANNEL_LABELS}
+    ax.set_xlim(0, args.history)
+    ax.set_ylim(0, proto.DISTANCE_THRESHOLD)
+    ax.set_title("Distance over Time (mm)")
+    ax.set_xlabel("Samples")
+    ax.set_ylabel("Distance (mm)")
+    ax.legend()
+    alarms = make_alarms(args, None)
+
+    def update(frame):
+        t, dists = proto.read_distances_stamped(ser, args.addr)
+        if alarms:
+            alarms.evaluate(t, dists)
+        for i, label in enumerate(proto.CHANNEL_LABELS):
+            history[label].append(dists[i] if dists else 0)
+            lines[label].set_data(range(len(history[label])), history[label])
+        return list(lines.values())
+
+    ani = animation.FuncAnimation(fig, update, interval=int(args.interval * 1000), cache_frame_data=False)
+    plt.show()
+    report_alarms(args, alarms)
+    return 0
+
+
+def cmd_baud(args) -> int:
+    import dyp_link
+
+    if args.upgrade:
+        result = dyp_link.negotiate(args.port, args.addrs, max_baud=args.max_baud)
+    else:
+        result = dyp_link.scan_bus(args.port, args.addrs)
+        for addr, baud in result.items():
+            print(f"{'✅' if baud else '❌'} {addr:#04x}: {baud if baud else 'no response'}")
+    return 0 if any(result.values()) else 1
+
+
+def cmd_check(args) -> int:
+    from dyp_registers import RegisterCache
+
+    names = ["address", "baud", "mode", "angle", "denoise"] + (["distance"] if args.distance else [])
+    healthy = 0
+    with proto.open_port(args.port, args.baud) as ser:
+        report_startup(args)
+        cache = RegisterCache(ser)
+        for addr in args.addrs:
+            vals = cache.get(addr, names)
+            ok = all(v is not None for v in vals.values())
+            healthy += ok
+            print(f"{'✅' if ok else '❌'} {addr:#04x}: " + "  ".join(f"{n}={v}" for n, v in vals.items()))
+    print(f"{healthy}/{len(args.addrs)} healthy, {cache.frames} frame(s)")
+    return 0 if healthy == len(args.addrs) else 1
+
+
+def cmd_tune(args) -> int:
+    from dyp_tune import tune
+
+    if isinstance(args.target, list) and len(args.target) != len(args.channels):
+        print(f"[ERROR] {len(args.target)} targets given for {len(args.channels)} channels", file=sys.stderr)
+        return 2
+    ports = args.ports or ([args.port] if args.port else proto.list_ports())
+    if not ports:
+        print("[ERROR] no serial ports found; pass --ports", file=sys.stderr)
+        return 2
+    results = tune({port: args.addrs for port in ports}, samples=args.samples, target=args.target,
+                   channels=[c - 1 for c in args.channels], settle=args.settle, baud=args.baud,
+                   period=args.period)
+    tuned = [entry for res in results.values() for entry in res.values() if entry["applied"]]
+    return 0 if len(tuned) == len(ports) * len(args.addrs) else 1
+
+
+# --- Argument parsing ---
+
+def host_port(text: str):
+    """``"host:5005"`` -> ``("host", 5005)``."""
+    host, _, port = text.rpartition(":")
+    if not host or not port.isdigit() or not 0 < int(port) < 65536:
+        raise argparse.ArgumentTypeError(f"expected HOST:PORT, got {text!r}")
+    return host, int(port)
+
+
+def channel_list(text: str):
+    """``"1,3"`` -> ``[1, 3]``, rejecting channels the E08 does not have."""
+    channels = [int(c) for c in text.split(",")]
+    if any(not 1 <= c <= len(proto.CHANNEL_LABELS) for c in channels):
+        raise argparse.ArgumentTypeError(f"channels must be 1-{len(proto.CHANNEL_LABELS)}")
+    return channels
+
+
+def build_parser() -> argparse.ArgumentParser:
+    link = argparse.ArgumentParser(add_help=False)
+    link.add_argument("-b", "--baud", type=int,
+                      help=f"baud rate (default: saved by 'dyp baud --upgrade', else {proto.DEFAULT_BAUD})")
+    link.add_argument("--timing", action="store_true", help="report time from startup to the first bus frame")
+
+    bus = argparse.ArgumentParser(add_help=False, parents=[link])
+    bus.add_argument("-p", "--port", default=proto.DEFAULT_PORT, help=f"serial port (default {proto.DEFAULT_PORT})")
+
+    addr = argparse.ArgumentParser(add_help=False)
+    addr.add_argument("-a", "--addr", type=lambda s: int(s, 0), default=proto.DEFAULT_ADDR,
+                      help="sensor Modbus address (default 0x01)")
+
+    interval = argparse.ArgumentParser(add_help=False)
+    interval.add_argument("-i", "--interval", type=float, default=proto.POLL_INTERVAL,
+                          help=f"seconds between polls (default {proto.POLL_INTERVAL})")
+    interval.add_argument("--adaptive", action="store_true",
+                          help="poll fast while readings change and back off while they are steady")
+    interval.add_argument("--min-interval", type=float, default=0.02, help="adaptive: fastest poll interval")
+    interval.add_argument("--max-interval", type=float, default=2.0, help="adaptive: slowest poll interval")
+    interval.add_argument("--change-mm", type=float, default=20, help="adaptive: movement that counts as activity")
+
+    alarm = argparse.ArgumentParser(add_help=False)
+    alarm.add_argument("--alarm", type=float, metavar="MM", help="raise a proximity alarm below this distance")
+    alarm.add_argument("--hysteresis", type=float, default=50, help="alarm clears this far above the threshold")
+    alarm.add_argument("--debounce", type=int, default=2, help="consecutive samples to raise or clear")
+    alarm.add_argument("--alarm-udp", type=host_port, metavar="HOST:PORT",
+                       help="also send alarm events as JSON datagrams")
+
+    parser = argparse.ArgumentParser(prog="dyp", description="Headless tools for DYP-E08 ultrasonic sensors.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("poll", parents=[bus, addr, interval], help="read the four channel distances")
+    p.add_argument("-n", "--count", type=int, default=1, help="number of readings (default 1)")
+    p.set_defaults(func=cmd_poll)
+
+    p = sub.add_parser("log", parents=[bus, addr, interval, alarm], help="log readings to sensor_log_*.csv")
+    p.add_argument("-d", "--duration", type=float, default=0, help="seconds to log, 0 = until Ctrl+C")
+    p.add_argument("-o", "--out", default=".", help="output directory")
+    p.set_defaults(func=cmd_log)
+
+    addrs = argparse.ArgumentParser(add_help=False)
+    addrs.add_argument("--addrs", type=lambda s: [int(a, 0) for a in s.split(",")], default=[proto.DEFAULT_ADDR],
+                       help="comma separated sensor addresses (default 0x01)")
+
+    p = sub.add_parser("config", parents=[bus, addrs], help="write angle and denoise levels")
+    p.add_argument("--angle", type=int, choices=range(1, 5), default=2)
+    p.add_argument("--denoise", type=int, choices=range(1, 6), default=2)
+    p.add_argument("--wait-powerup", type=float, default=0,
+                   help="seconds to wait for the sensor to power up before writing")
+    p.set_defaults(func=cmd_config)
+
+    p = sub.add_parser("scan", parents=[bus], help="find sensors responding on the bus")
+    p.add_argument("--first", type=lambda s: int(s, 0), default=0x01)
+    p.add_argument("--last", type=lambda s: int(s, 0), default=0x10)
+    p.add_argument("--timeout", type=float, default=0.1, help="per-address response timeout")
+    p.add_argument("--list-ports", action="store_true", help="only list available serial ports")
+    p.set_defaults(func=cmd_scan)
+
+    p = sub.add_parser("stream", parents=[bus, addr, interval, alarm], help="print readings continuously")
+    p.add_argument("--plot", action="store_true", help="show a live matplotlib plot instead")
+    p.add_argument("--history", type=int, default=50, help="samples shown in the live plot")
+    p.set_defaults(func=cmd_stream)
+
+    p = sub.add_parser("baud", parents=[bus, addrs], help="detect each sensor's baud rate, optionally upgrade")
+    p.add_argument("--upgrade", action="store_true",
+                   help="move all responders to the fastest rate and save it to "
+                   + os.path.basename(proto.CONFIG_FILE))
+    p.add_argument("--max-baud", type=int, default=115200, help="highest rate the adapter supports")
+    p.set_defaults(func=cmd_baud)
+
+    p = sub.add_parser("check", parents=[bus, addrs], help="read each sensor's configuration registers")
+    p.add_argument("--distance", action="store_true", help="also read the distance block")
+    p.set_defaults(func=cmd_check)
+
+    p = sub.add_parser("tune", parents=[link, addrs],
+                       help="sweep all angle/denoise levels against a fixed target and keep the best")
+    p.add_argument("-p", "--port", help="serial port (default: every connected port, or --ports)")
+    p.add_argument("--ports", type=lambda s: s.split(","), help="comma separated buses swept in parallel")
+    p.add_argument("-n", "--samples", type=int, default=30, help="readings per sensor per setting")
+    p.add_argument("--target", type=lambda s: [float(v) for v in s.split(",")] if "," in s else float(s),
+                   help="distance to the reference target in mm (one value or one per channel)")
+    p.add_argument("--channels", type=channel_list, default=[1, 2, 3, 4],
+                   help="channels facing the target (default 1,2,3,4)")
+    p.add_argument("--settle", type=float, default=0.5, help="seconds to wait after each settings change")
+    p.add_argument("--period", type=float, default=proto.POLL_INTERVAL,
+                   help="seconds between sample passes, at least one measurement cycle (default %(default)s)")
+    p.set_defaults(func=cmd_tune)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.baud is None:
+        args.baud = proto.saved_baud()
+    try:
+        return args.func(args)
+    except OSError as e:
+        print(f"[ERROR] {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
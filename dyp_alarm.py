@@ -0,0 +1,129 @@
+# Proximity alarm engine evaluated straight after frame decoding
+import json
+import socket
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+
+class AlarmRule(NamedTuple):
+    name: str
+    channels: tuple  # 0-based channel indices; one channel = per-channel rule, several = zone
+    near_mm: float  # alarm when the closest reading in the zone drops below this
+    clear_mm: float  # ...and clear only once it is back above this (hysteresis)
+    debounce: int = 2  # consecutive near samples needed to raise
+    clear_debounce: int = 2  # consecutive far samples needed to clear
+
+
+def channel_rules(near_mm: float, hysteresis_mm: float = 50, debounce: int = 2, channels: int = 4):
+    """One rule per channel with the same thresholds."""
+    return [AlarmRule(f"Channel {i + 1}", (i,), near_mm, near_mm + hysteresis_mm, debounce, debounce)
+            for i in range(channels)]
+
+
+class AlarmEngine:
+    """Evaluates every rule on each sample in one vectorized pass.
+
+    Readings of 0 (out of range) count as nothing in range. Callbacks
+    receive an event dict ``{"rule", "state", "distance", "channel", "t",
+    "latency"}`` where ``state`` is ``"alarm"`` or ``"clear"``, ``t`` the
+    sample's monotonic timestamp and ``latency`` the seconds from that
+    timestamp to dispatch. ``channel`` is the 1-based channel with the
+    closest reading, or the rule's first channel when nothing is in range
+    (e.g. a clear caused by 0 readings). ``latency_stats()`` covers sample time to all
+    callbacks having returned, counted against ``budget`` (normally the
+    poll period).
+    """
+
+    def __init__(self, rules, channels: int = 4, budget: float = 0.2):
+        self.rules = list(rules)
+        self.budget = budget
+        self.callbacks = []
+        self.members = np.zeros((len(self.rules), channels), dtype=bool)
+        for r, rule in enumerate(self.rules):
+            self.members[r, list(rule.channels)] = True
+        self.near = np.array([rule.near_mm for rule in self.rules], dtype=float)
+        self.clear = np.array([rule.clear_mm for rule in self.rules], dtype=float)
+        self.debounce = np.array([rule.debounce for rule in self.rules])
+        self.clear_debounce = np.array([rule.clear_debounce for rule in self.rules])
+        self.active = np.zeros(len(self.rules), dtype=bool)
+        self.count = np.zeros(len(self.rules), dtype=int)
+        self.latencies = []
+        self.over_budget = 0
+
+    def on(self, callback) -> None:
+        self.callbacks.append(callback)
+
+    def evaluate(self, t: float, dists):
+        """Feed one decoded frame; returns the events fired. ``dists`` None (timeout) is ignored."""
+        if dists is None:
+            return []
+        d = np.asarray(dists, dtype=float)
+        d[d <= 0] = np.inf
+        zone = np.where(self.members, d, np.inf)
+        closest = zone.min(axis=1)
+        nearest_ch = zone.argmin(axis=1)
+
+        # count consecutive samples pointing towards the other state
+        toward = np.where(self.active, closest > self.clear, closest < self.near)
+        self.count = np.where(toward, self.count + 1, 0)
+        needed = np.where(self.active, self.clear_debounce, self.debounce)
+        flip = toward & (self.count >= needed)
+        if not flip.any():
+            return []
+        self.active ^= flip
+        self.count[flip] = 0
+
+        events = []
+        for r in np.flatnonzero(flip):
+            in_range = not np.isinf(closest[r])
+            channel = int(nearest_ch[r]) if in_range else self.rules[r].channels[0]
+            events.append({"rule": self.rules[r].name, "state": "alarm" if self.active[r] else "clear",
+                           "distance": float(closest[r]) if in_range else None,
+                           "channel": channel + 1, "t": t})
+        for event in events:
+            event["latency"] = time.monotonic() - t
+            for callback in self.callbacks:
+                callback(event)
+            self.record_latency(time.monotonic() - t)
+        return events
+
+    def record_latency(self, latency: float) -> None:
+        self.latencies.append(latency)
+        if len(self.latencies) > 1000:
+            del self.latencies[:500]
+        if latency > self.budget:
+            self.over_budget += 1
+
+    def latency_stats(self) -> dict:
+        """Sample-to-callbacks-done latency in ms over the recent events."""
+        if not self.latencies:
+            return {"events": 0}
+        lat = np.array(self.latencies) * 1000
+        return {"events": len(lat), "mean_ms": float(lat.mean()), "p95_ms": float(np.percentile(lat, 95)),
+                "max_ms": float(lat.max()), "over_budget": self.over_budget}
+
+
+# --- Hooks ---
+
+def gpio_hook(write, pins: dict, active_high: bool = True):
+    """Drive an output per rule, e.g. ``gpio_hook(GPIO.output, {"Channel 1": 17})``."""
+    def callback(event):
+        pin = pins.get(event["rule"])
+        if pin is not None:
+            write(pin, (event["state"] == "alarm") == active_high)
+    return callback
+
+
+def udp_hook(host: str, port: int):
+    """Send each event as a JSON datagram; non-blocking so a dead listener never stalls the poll loop."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+
+    def callback(event):
+        try:
+            sock.sendto(json.dumps(event).encode(), (host, port))
+        except OSError:
+            pass
+    return callback
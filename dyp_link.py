@@ -0,0 +1,109 @@
+# Baud-rate detection and negotiation for the DYP-E08 sensor bus
+import time
+
+import dyp_protocol as proto
+
+# Probe order: the factory default first, then what dyp_reader_plus.py uses, then the rest
+PROBE_ORDER = (9600, 115200, 19200, 38400, 57600, 4800, 14400, 76800, 2400)
+
+
+def probe(ser, addr: int, baud: int, attempts: int = 2) -> bool:
+    """Switch the open port to ``baud`` and check that ``addr`` answers a register read."""
+    ser.baudrate = baud
+    # a 7-byte response plus turnaround; generous at low rates, short at high ones
+    ser.timeout = max(0.05, 3 * 7 * 10 / baud + 0.02)
+    time.sleep(0.01)
+    for _ in range(attempts):
+        if proto.read_registers(ser, addr, proto.REG_ADDRESS, 1) is not None:
+            return True
+    return False
+
+
+def detect_baud(ser, addr: int, candidates=PROBE_ORDER):
+    """Current baud rate of one sensor, or None if it answers at none of ``candidates``."""
+    for baud in candidates:
+        if probe(ser, addr, baud):
+            return baud
+    return None
+
+
+def scan_bus(port: str, addrs, candidates=PROBE_ORDER) -> dict:
+    """{addr: baud or None} for every address in ``addrs``."""
+    with proto.open_port(port, candidates[0]) as ser:
+        return {addr: detect_baud(ser, addr, candidates) for addr in addrs}
+
+
+def switch_rate(ser, addr: int, old: int, new: int):
+    """Write ``new`` into one sensor's ``REG_BAUD``; returns the rate it answers at afterwards (None if lost)."""
+    probe(ser, addr, old)
+    proto.write_register(ser, addr, proto.REG_BAUD, proto.BAUD_CODES[new])
+    # the echo may come back at either rate; verification below decides
+    time.sleep(0.1)
+    if probe(ser, addr, new, attempts=3):
+        return new
+    if probe(ser, addr, old):
+        return old
+    return detect_baud(ser, addr)
+
+
+def negotiate(port: str, addrs, max_baud: int = 115200, save: bool = True, log=print) -> dict:
+    """Move every responding sensor on ``port`` to the fastest common rate.
+
+    Candidate rates are tried from ``max_baud`` down to the slowest rate a
+    sensor is already on. At each one every sensor is written the rate code
+    in ``REG_BAUD`` and re-probed at the new rate; the first rate all
+    responders verify at wins. If any responder misses a rate (unsupported,
+    or firmware that only applies it after a power cycle), the sensors that
+    did switch are written back to their previous rate and re-verified
+    before the next slower rate is tried, so the bus is never left split.
+    The rate the bus ends up on is recorded as ``"baud"`` in the saved
+    config when every responder is on it. Returns {addr: final baud or None}.
+    """
+    rates = sorted((b for b in proto.BAUD_CODES if b <= max_baud), reverse=True)
+    with proto.open_port(port, proto.DEFAULT_BAUD) as ser:
+        current = {addr: detect_baud(ser, addr) for addr in addrs}
+        for addr, baud in current.items():
+            log(f"[DETECT] {addr:#04x}: {baud if baud else 'no response'}")
+        result = {addr: baud for addr, baud in current.items() if baud}
+        if not result:
+            return current
+
+        floor = min(result.values())
+        for target in (rate for rate in rates if rate >= floor):
+            before = dict(result)
+            for addr in before:
+                if result[addr] == target:
+                    continue
+                result[addr] = switch_rate(ser, addr, before[addr], target)
+                if result[addr] == target:
+                    log(f"✅ {addr:#04x}: {before[addr]} -> {target}")
+                elif result[addr] == before[addr]:
+                    log(f"⚠️ {addr:#04x}: did not take {target}, still at {before[addr]}"
+                        f" (power cycle may be needed)")
+                    break
+                else:
+                    log(f"❌ {addr:#04x}: lost after change to {target}, now {result[addr] or 'not found'}")
+                    break
+            if all(baud == target for baud in result.values()):
+                break
+
+            # not every responder made it: undo this step before trying a slower rate
+            for addr, baud in result.items():
+                if baud != target or before[addr] == target:
+                    continue
+                result[addr] = switch_rate(ser, addr, target, before[addr])
+                if result[addr] == before[addr]:
+                    log(f"↩️ {addr:#04x}: rolled back to {before[addr]}")
+                else:
+                    log(f"❌ {addr:#04x}: rollback to {before[addr]} not verified, now {result[addr] or 'not found'}")
+            result = {addr: baud for addr, baud in result.items() if baud}
+            if not result:
+                break
+
+    rates_found = set(result.values())
+    if save and len(rates_found) == 1:
+        proto.update_config(baud=rates_found.pop())
+    elif len(rates_found) > 1:
+        log(f"⚠️ Bus is on mixed rates {sorted(rates_found)}; saved baud left unchanged.")
+    lost = {addr: None for addr, baud in current.items() if baud and addr not in result}
+    return {**current, **result, **lost}
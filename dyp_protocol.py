@@ -0,0 +1,165 @@
+# Shared DYP-E08 Modbus RTU helpers
+# Kept free of GUI, plotting and pandas imports so headless tools start fast.
+import json
+import os
+import struct
+import time
+from datetime import datetime, timedelta
+
+DEFAULT_PORT = "COM13"
+DEFAULT_BAUD = 9600
+DEFAULT_ADDR = 0x01
+POLL_INTERVAL = 0.2
+CHANNEL_LABELS = ["Channel 1", "Channel 2", "Channel 3", "Channel 4"]
+DISTANCE_THRESHOLD = 2000  # mm
+# next to this module, so scripts started from utils/ or elsewhere find the same file
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sensor_config.json")
+
+# --- Register addresses ---
+REG_DISTANCE = 0x0106  # four consecutive channel distances (mm)
+REG_ADDRESS = 0x0200
+REG_BAUD = 0x0201  # baud rate code, see BAUD_CODES
+REG_MODE = 0x0207
+REG_ANGLE = 0x0208
+REG_DENOISE = 0x021A
+
+BAUD_CODES = {2400: 0x0001, 4800: 0x0002, 9600: 0x0003, 14400: 0x0004, 19200: 0x0005,
+              38400: 0x0006, 57600: 0x0007, 76800: 0x0008, 115200: 0x0009}
+
+
+# --- CRC16 for Modbus ---
+def modbus_crc16(data: bytes) -> bytes:
+    crc = 0xFFFF
+    for b in data:
+        crc ^= b
+        for _ in range(8):
+            lsb = crc & 0x0001
+            crc >>= 1
+            if lsb:
+                crc ^= 0xA001
+    return crc.to_bytes(2, byteorder="little")
+
+
+def build_read(addr: int, reg: int, count: int) -> bytes:
+    cmd = struct.pack('>B B H H', addr, 0x03, reg, count)
+    return cmd + modbus_crc16(cmd)
+
+
+def build_write(addr: int, reg: int, value: int) -> bytes:
+    cmd = struct.pack('>B B H H', addr, 0x06, reg, value)
+    return cmd + modbus_crc16(cmd)
+
+
+def crc_ok(frame: bytes) -> bool:
+    return len(frame) > 2 and modbus_crc16(frame[:-2]) == frame[-2:]
+
+
+# --- Serial helpers ---
+def open_port(port: str = DEFAULT_PORT, baud: int = DEFAULT_BAUD, timeout: float = 0.3):
+    import serial  # deferred so `--help` and argument errors never pay for it
+
+    return serial.Serial(port, baud, timeout=timeout)
+
+
+def saved_baud(default: int = DEFAULT_BAUD, path: str = CONFIG_FILE) -> int:
+    """Bus baud rate recorded by the last negotiation, else ``default``."""
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                return int(json.load(f).get("baud", default))
+        except (OSError, ValueError, TypeError):
+            pass
+    return default
+
+
+def update_config(path: str = CONFIG_FILE, **values) -> None:
+    """Merge ``values`` into the saved config without dropping other keys."""
+    config = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            config = json.load(f)
+    config.update(values)
+    with open(path, "w") as f:
+        json.dump(config, f)
+
+
+def list_ports():
+    import serial.tools.list_ports
+
+    return [p.device for p in serial.tools.list_ports.comports()]
+
+
+def read_registers(ser, addr: int, reg: int, count: int):
+    """One 0x03 request; returns the register values or None on timeout/bad frame."""
+    ser.reset_input_buffer()
+    ser.write(build_read(addr, reg, count))
+    resp = ser.read(5 + 2 * count)
+    if len(resp) != 5 + 2 * count or resp[0] != addr or resp[1] != 0x03 or not crc_ok(resp):
+        return None
+    return list(struct.unpack(f'>{count}H', resp[3:3 + 2 * count]))
+
+
+def write_register(ser, addr: int, reg: int, value: int) -> bool:
+    """One 0x06 request; the sensor echoes the request on success."""
+    cmd = build_write(addr, reg, value)
+    ser.reset_input_buffer()
+    ser.write(cmd)
+    resp = ser.read(8)
+    return resp[:6] == cmd[:6]
+
+
+def read_distances(ser, addr: int = DEFAULT_ADDR, threshold: int = DISTANCE_THRESHOLD):
+    """Four channel distances in mm (0 when beyond ``threshold``), or None."""
+    vals = read_registers(ser, addr, REG_DISTANCE, len(CHANNEL_LABELS))
+    if vals is None:
+        return None
+    return [v if v <= threshold else 0 for v in vals]
+
+
+def read_distances_stamped(ser, addr: int = DEFAULT_ADDR, threshold: int = DISTANCE_THRESHOLD):
+    """``(t, distances)`` where ``t`` is the monotonic midpoint of request and response.
+
+    The midpoint is the best estimate of when the sensor produced the
+    reading, independent of how long the read itself blocked.
+    """
+    t_req = time.monotonic()
+    dists = read_distances(ser, addr, threshold)
+    return (t_req + time.monotonic()) / 2, dists
+
+
+# --- Timestamps ---
+class SampleClock:
+    """Maps monotonic sample times onto wall-clock labels.
+
+    The wall clock is read once, at construction, so stamps never jump with
+    NTP adjustments and samples from different ports sharing one clock stay
+    comparable to the microsecond.
+    """
+
+    def __init__(self):
+        self.t0 = time.monotonic()
+        self.wall0 = datetime.now()
+
+    def elapsed(self, t: float) -> float:
+        return t - self.t0
+
+    def wall(self, t: float) -> datetime:
+        return self.wall0 + timedelta(seconds=t - self.t0)
+
+    def stamp(self, t: float) -> str:
+        """``HH:MM:SS.mmm`` label for the CSV ``Time`` column."""
+        return self.wall(t).strftime("%H:%M:%S.%f")[:-3]
+
+
+def write_settings(ser, addr: int, angle: int, denoise: int, retries: int = 3) -> bool:
+    """Enable custom output mode and write angle/denoise levels, retrying the whole set."""
+    for _ in range(retries):
+        ok = write_register(ser, addr, REG_MODE, 0x0001)
+        time.sleep(0.05)
+        ok = write_register(ser, addr, REG_ANGLE, angle) and ok
+        time.sleep(0.05)
+        ok = write_register(ser, addr, REG_DENOISE, denoise) and ok
+        if ok:
+            return True
+        time.sleep(0.1)
+    return False
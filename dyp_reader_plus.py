@@ -13,8 +13,11 @@ import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from collections import deque
 import statistics
-
-CONFIG_FILE = "sensor_config.json"
+from log_pyramid import PyramidWriter, PyramidView, HistoryPlot
+from adaptive_poll import AdaptivePoller, frame_time
+from dyp_protocol import CONFIG_FILE, saved_baud, update_config, SampleClock
+from dyp_registers import RegisterCache
+from dyp_alarm import AlarmEngine, channel_rules
 
 # --- CRC16 for Modbus ---
 def modbus_crc16(data):
@@ -36,10 +39,12 @@ def build_modbus_write(addr, reg, value):
 import serial.tools.list_ports
 
 PORT = None  # dynamic selection
-BAUD = 115200
+BAUD = saved_baud(115200)
 POLL_INTERVAL = 0.2
+READ_ADDR = 0x02
 CHANNEL_LABELS = ["Channel 1", "Channel 2", "Channel 3", "Channel 4"]
 DISTANCE_THRESHOLD = 2000
+ALARM_DISTANCE = 150  # mm, "object too close" on any channel
 
 class MultiChannelApp:
     def __init__(self, root):
@@ -50,15 +55,26 @@ class MultiChannelApp:
         self.running = False
         self.smooth_enabled = tk.BooleanVar(value=False)
         self.smooth_window = tk.IntVar(value=5)
+        self.adaptive_enabled = tk.BooleanVar(value=False)
+        self.poller = AdaptivePoller(max_interval=1.0, bus_interval=frame_time(BAUD))
+        self.poller.add_sensor(READ_ADDR)
+        self.alarm_var = tk.StringVar(value="Alarm: clear")
+        self.alarms = AlarmEngine(channel_rules(ALARM_DISTANCE), budget=POLL_INTERVAL)
+        self.alarms.on(self.on_alarm)
         self.angle_level_var = tk.StringVar(value="2")
         self.denoise_level_var = tk.StringVar(value="2")
         self.active_channels = {label: tk.BooleanVar(value=True) for label in CHANNEL_LABELS}
         self.data_vars = {}
         self.std_vars = {}
         self.history = {label: deque(maxlen=50) for label in CHANNEL_LABELS}
-        self.csv_file = open(f"sensor_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv", "w", newline="")
+        self.history_span = tk.IntVar(value=0)  # seconds of history to plot from the pyramid, 0 = last 50 samples
+        log_name = f"sensor_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        self.csv_file = open(log_name, "w", newline="")
         self.csv_writer = csv.writer(self.csv_file)
         self.csv_writer.writerow(["Time"] + CHANNEL_LABELS)
+        self.clock = SampleClock()
+        self.pyramid = PyramidWriter(log_name, CHANNEL_LABELS)
+        self.history_plot = HistoryPlot(PyramidView(log_name))
         self.build_gui()
         self.setup_plot()
         if self.open_serial():
@@ -80,6 +96,7 @@ class MultiChannelApp:
         ttk.Checkbutton(frm, text="Enable Smoothing", variable=self.smooth_enabled).grid(column=2, row=0)
         ttk.Label(frm, text="Window Size:").grid(column=3, row=0)
         ttk.Entry(frm, textvariable=self.smooth_window, width=5).grid(column=4, row=0)
+        ttk.Checkbutton(frm, text="Adaptive Rate", variable=self.adaptive_enabled).grid(column=5, row=0)
 
         for i, label in enumerate(CHANNEL_LABELS):
             ttk.Label(frm, text=label).grid(column=0, row=i+1, sticky="e")
@@ -102,6 +119,9 @@ class MultiChannelApp:
         ttk.Button(frm, text="Apply Settings", command=self.apply_sensor_settings).grid(column=4, row=6)
         ttk.Button(frm, text="Save Config", command=self.save_config).grid(column=0, row=7, pady=10)
         ttk.Button(frm, text="Load Config", command=self.load_config).grid(column=1, row=7, pady=10)
+        ttk.Label(frm, text="History (s):").grid(column=2, row=7, sticky="e")
+        ttk.Entry(frm, textvariable=self.history_span, width=7).grid(column=3, row=7, sticky="w")
+        ttk.Label(frm, textvariable=self.alarm_var, font=("Arial", 12)).grid(column=4, row=7, sticky="w")
 
     def setup_plot(self):
         self.fig, self.ax = plt.subplots()
@@ -115,6 +135,12 @@ class MultiChannelApp:
         self.ani = animation.FuncAnimation(self.fig, self.update_plot, interval=500, cache_frame_data=False)
 
     def update_plot(self, frame):
+        span = self.history_span.get()
+        if span > 0:
+            return self.update_history_plot(span)
+        self.history_plot.clear()
+        self.ax.set_xlim(0, 50)
+        self.ax.set_xlabel("Samples")
         for label, line in self.lines.items():
             if self.active_channels[label].get():
                 data = list(self.history[label])
@@ -128,6 +154,13 @@ class MultiChannelApp:
                 line.set_data([], [])
         return list(self.lines.values())
 
+    def update_history_plot(self, span):
+        # Long history comes from the on-disk pyramid at roughly one point per pixel
+        now = self.clock.elapsed(time.monotonic())
+        width = int(self.fig.get_figwidth() * self.fig.dpi)
+        active = [self.active_channels[label].get() for label in self.lines]
+        return self.history_plot.draw(self.ax, list(self.lines.values()), now - span, now, active, width)
+
     def open_serial(self):
         global PORT
         PORT = self.port_var.get()
@@ -216,8 +249,8 @@ class MultiChannelApp:
             "window": self.smooth_window.get(),
             "active": {k: v.get() for k, v in self.active_channels.items()}
         }
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(config, f)
+        # merge so the negotiated "baud" and the "tuned" results survive
+        update_config(CONFIG_FILE, **config)
         messagebox.showinfo("Config Saved", "Sensor configuration saved successfully.")
 
     def load_config(self):
@@ -231,22 +264,34 @@ class MultiChannelApp:
                 for k, v in config.get("active", {}).items():
                     if k in self.active_channels:
                         self.active_channels[k].set(v)
+        # Show what the sensor actually holds; skipped while the read loop owns the bus
+        if self.serial and not self.running:
+            vals = RegisterCache(self.serial).get(READ_ADDR, ["angle", "denoise"])
+            if vals["angle"] in range(1, 5):
+                self.angle_level_var.set(str(vals["angle"]))
+            if vals["denoise"] in range(1, 6):
+                self.denoise_level_var.set(str(vals["denoise"]))
 
     def read_channels(self):
-        cmd = struct.pack('>B B H H', 0x02, 0x03, 0x0106, 0x0004)  # Read from 0x0106 on address 0x02
+        cmd = struct.pack('>B B H H', READ_ADDR, 0x03, 0x0106, 0x0004)  # Read from 0x0106 on READ_ADDR
         cmd += modbus_crc16(cmd)
         self.serial.write(cmd)
         time.sleep(0.02)
         resp = self.serial.read(13)
         
-        if len(resp) == 13 and resp[0] == 0x02 and resp[1] == 0x03:
+        if len(resp) == 13 and resp[0] == READ_ADDR and resp[1] == 0x03:
             return [(resp[3+i*2] << 8 | resp[4+i*2]) if (resp[3+i*2] << 8 | resp[4+i*2]) <= DISTANCE_THRESHOLD else 0 for i in range(4)]
         return None
 
     def read_loop(self):
         while self.running:
+            t_req = time.monotonic()
             dists = self.read_channels()
-            row = [datetime.now().strftime("%H:%M:%S")]
+            t = (t_req + time.monotonic()) / 2  # request/response midpoint
+            # a channel switched to Inactive must not raise (or hold) an alarm
+            self.alarms.evaluate(t, [d if self.active_channels[label].get() else 0
+                                     for d, label in zip(dists, CHANNEL_LABELS)] if dists else None)
+            row = [self.clock.stamp(t)]
             for i, label in enumerate(CHANNEL_LABELS):
                 if self.active_channels[label].get():
                     dist = dists[i] if dists else 0
@@ -264,7 +309,20 @@ class MultiChannelApp:
                     row.append("")
             self.csv_writer.writerow(row)
             self.csv_file.flush()
-            time.sleep(POLL_INTERVAL)
+            self.pyramid.append(self.clock.elapsed(t), row[1:])
+            self.pyramid.flush()
+            if self.adaptive_enabled.get():
+                self.poller.observe(READ_ADDR, dists)
+                self.poller.wait_next()
+            else:
+                time.sleep(POLL_INTERVAL)
+
+    def on_alarm(self, event):
+        print(f"[ALARM] {event['rule']}: {event['state']} at {event['distance']} mm")
+        active = [rule.name for rule, on in zip(self.alarms.rules, self.alarms.active) if on]
+        self.alarm_var.set(f"⚠️ Too close: {', '.join(active)}" if active else "Alarm: clear")
+        if event["state"] == "alarm" and self.adaptive_enabled.get():
+            self.poller.trigger(READ_ADDR, event["channel"] - 1)
 
     def start(self):
         if not self.open_serial(): return
@@ -283,6 +341,7 @@ class MultiChannelApp:
         if self.serial and self.serial.is_open:
             self.serial.close()
         self.csv_file.close()
+        self.pyramid.close()
         self.root.quit()
 
 if __name__ == '__main__':
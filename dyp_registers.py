@@ -0,0 +1,133 @@
+# DYP-E08 register map, coalesced block-read planning and per-sensor register cache
+import time
+from typing import NamedTuple
+
+import dyp_protocol as proto
+
+MAX_BLOCK = 125  # Modbus limit for one 0x03 read
+DEFAULT_MAX_GAP = 32  # unwanted registers we are willing to read to save a round-trip
+
+
+class Register(NamedTuple):
+    name: str
+    addr: int
+    count: int = 1
+    writable: bool = True
+    description: str = ""
+
+
+REGISTER_MAP = {reg.name: reg for reg in (
+    Register("distance", proto.REG_DISTANCE, 4, False, "channel 1-4 distance (mm)"),
+    Register("address", proto.REG_ADDRESS, description="Modbus slave address"),
+    Register("baud", proto.REG_BAUD, description="baud rate code (dyp_protocol.BAUD_CODES)"),
+    Register("mode", proto.REG_MODE, description="1 = custom output mode"),
+    Register("angle", proto.REG_ANGLE, description="beam angle level 1-4"),
+    Register("denoise", proto.REG_DENOISE, description="denoise level 1-5"),
+)}
+
+
+def plan_reads(names, max_gap: int = DEFAULT_MAX_GAP, max_block: int = MAX_BLOCK):
+    """Fewest ``(start, count)`` 0x03 reads covering the named registers.
+
+    Registers are sorted by address and merged greedily while the hole
+    between them is at most ``max_gap`` and the block stays within
+    ``max_block`` registers, which is optimal for covering sorted spans.
+    """
+    spans = sorted((REGISTER_MAP[n].addr, REGISTER_MAP[n].addr + REGISTER_MAP[n].count) for n in names)
+    blocks = []
+    for start, end in spans:
+        if blocks:
+            b_start, b_end = blocks[-1]
+            if start - b_end <= max_gap and max(end, b_end) - b_start <= max_block:
+                blocks[-1] = (b_start, max(end, b_end))
+                continue
+        blocks.append((start, end))
+    return [(start, end - start) for start, end in blocks]
+
+
+class RegisterCache:
+    """Per-sensor register values with read times.
+
+    ``get()`` only goes to the bus for registers older than ``max_age`` and
+    fetches them with the fewest block reads. If a sensor rejects a block
+    that spans unmapped addresses, the block is retried as exact spans.
+    ``frames`` counts requests sent, for comparing against one-by-one reads.
+    """
+
+    def __init__(self, ser, max_age: float = 5.0, max_gap: int = DEFAULT_MAX_GAP):
+        self.ser = ser
+        self.max_age = max_age
+        self.max_gap = max_gap
+        self.values = {}  # addr -> {register address: (value, monotonic time)}
+        self.frames = 0
+
+    def _read_block(self, addr: int, start: int, count: int) -> bool:
+        self.frames += 1
+        vals = proto.read_registers(self.ser, addr, start, count)
+        if vals is None:
+            return False
+        now = time.monotonic()
+        regs = self.values.setdefault(addr, {})
+        for i, v in enumerate(vals):
+            regs[start + i] = (v, now)
+        return True
+
+    def age(self, addr: int, name: str) -> float:
+        """Seconds since ``name`` was last read or written (inf if never)."""
+        reg = REGISTER_MAP[name]
+        stamps = [self.values.get(addr, {}).get(reg.addr + i, (None, -float("inf")))[1] for i in range(reg.count)]
+        return time.monotonic() - min(stamps)
+
+    def refresh(self, addr: int, names, max_age: float = None) -> bool:
+        """Re-read whichever of ``names`` are stale; False if any read failed.
+
+        A value is stale once its age reaches ``max_age``, so ``max_age=0``
+        always goes to the device.
+        """
+        max_age = self.max_age if max_age is None else max_age
+        stale = [n for n in names if self.age(addr, n) >= max_age]
+        ok = True
+        for start, count in plan_reads(stale, self.max_gap):
+            if self._read_block(addr, start, count):
+                continue
+            inside = [n for n in stale if start <= REGISTER_MAP[n].addr < start + count]
+            exact = plan_reads(inside, max_gap=0)
+            if exact == [(start, count)]:
+                ok = False
+                continue
+            for sub_start, sub_count in exact:
+                ok = self._read_block(addr, sub_start, sub_count) and ok
+        return ok
+
+    def get(self, addr: int, names, max_age: float = None) -> dict:
+        """``{name: value}`` (lists for multi-register entries), None where unreadable."""
+        self.refresh(addr, names, max_age)
+        regs = self.values.get(addr, {})
+        out = {}
+        for n in names:
+            reg = REGISTER_MAP[n]
+            vals = [regs.get(reg.addr + i, (None, 0))[0] for i in range(reg.count)]
+            out[n] = vals if reg.count > 1 else vals[0]
+        return out
+
+    def write(self, addr: int, name: str, value: int) -> bool:
+        """Write-through: on an echoed write the cached value is updated without a re-read."""
+        reg = REGISTER_MAP[name]
+        if not reg.writable:
+            raise ValueError(f"register {name} is read-only")
+        self.frames += 1
+        if not proto.write_register(self.ser, addr, reg.addr, value):
+            self.invalidate(addr, [name])
+            return False
+        self.values.setdefault(addr, {})[reg.addr] = (value, time.monotonic())
+        return True
+
+    def invalidate(self, addr: int, names=None) -> None:
+        if names is None:
+            self.values.pop(addr, None)
+            return
+        regs = self.values.get(addr, {})
+        for n in names:
+            reg = REGISTER_MAP[n]
+            for i in range(reg.count):
+                regs.pop(reg.addr + i, None)
@@ -0,0 +1,184 @@
+# Automated angle/denoise sweep with noise scoring, run on all buses in parallel
+import csv
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from itertools import product
+
+import dyp_protocol as proto
+from dyp_registers import RegisterCache
+
+ANGLE_LEVELS = range(1, 5)
+DENOISE_LEVELS = range(1, 6)
+SETTLE = 0.5  # seconds after a settings change before sampling
+DROPOUT_WEIGHT = 500.0  # score mm per 100 % dropouts
+BIAS_WEIGHT = 1.0
+
+
+class RollingStats:
+    """Mean/std/dropout rate over the last ``window`` samples, updated in O(1)."""
+
+    def __init__(self, window: int):
+        self.samples = deque(maxlen=window)
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.valid = 0
+
+    def add(self, value) -> None:
+        if len(self.samples) == self.samples.maxlen:
+            old = self.samples[0]
+            if old is not None:
+                self.total -= old
+                self.total_sq -= old * old
+                self.valid -= 1
+        value = value if value else None  # 0 = timeout / out of range
+        self.samples.append(value)
+        if value is not None:
+            self.total += value
+            self.total_sq += value * value
+            self.valid += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.valid if self.valid else float("nan")
+
+    @property
+    def std(self) -> float:
+        if self.valid < 2:
+            return float("nan")
+        var = (self.total_sq - self.total * self.total / self.valid) / (self.valid - 1)
+        return max(var, 0.0) ** 0.5
+
+    @property
+    def dropout_rate(self) -> float:
+        return 1 - self.valid / len(self.samples) if self.samples else 1.0
+
+
+def score(stats: RollingStats, target: float = None) -> float:
+    """Lower is better: noise, plus bias against the known target, plus dropouts."""
+    if stats.valid < 2:
+        return float("inf")
+    bias = 0.0 if target is None else stats.mean - target
+    return stats.std + BIAS_WEIGHT * abs(bias) + DROPOUT_WEIGHT * stats.dropout_rate
+
+
+def channel_targets(target, channels) -> list:
+    """One target per entry of ``channels`` (0-based), or ValueError."""
+    channels = list(channels)
+    if not channels or any(not 0 <= ch < len(proto.CHANNEL_LABELS) for ch in channels):
+        raise ValueError(f"channels must be 0-{len(proto.CHANNEL_LABELS) - 1}, got {channels}")
+    targets = list(target) if isinstance(target, (list, tuple)) else [target] * len(channels)
+    if len(targets) != len(channels):
+        raise ValueError(f"{len(targets)} targets given for {len(channels)} channels")
+    return targets
+
+
+def sweep_bus(port: str, addrs, samples: int = 30, target=None, channels=(0, 1, 2, 3),
+              settle: float = SETTLE, baud: int = None, period: float = proto.POLL_INTERVAL,
+              apply_best: bool = True, log=print) -> dict:
+    """Try all angle/denoise combinations on every sensor of one bus at once.
+
+    Each combination is written to all sensors, then the sensors are polled
+    round-robin for ``samples`` readings each, one pass every ``period``
+    seconds so that each reading is a fresh measurement cycle rather than
+    the same value read back repeatedly. ``target`` is the distance to
+    the fixed reference target in mm (one value, or one per channel); without
+    it bias is not scored; per-channel targets line up with ``channels``
+    (0-based indices). Returns ``{addr: {"best": (angle, denoise),
+    "results": [row, ...], "applied": bool}}``.
+    """
+    baud = baud or proto.saved_baud()
+    targets = channel_targets(target, channels)
+    out = {addr: {"best": None, "results": [], "applied": False} for addr in addrs}
+    with proto.open_port(port, baud) as ser:
+        present = [addr for addr in addrs if proto.read_registers(ser, addr, proto.REG_ADDRESS, 1) is not None]
+        for addr in set(addrs) - set(present):
+            log(f"[{port}] ❌ {addr:#04x}: no response, skipped")
+        for angle, denoise in product(ANGLE_LEVELS, DENOISE_LEVELS):
+            live = [addr for addr in present if proto.write_settings(ser, addr, angle, denoise)]
+            for addr in set(present) - set(live):
+                log(f"[{port}] ❌ {addr:#04x}: could not set angle={angle} denoise={denoise}")
+            time.sleep(settle)
+
+            stats = {addr: [RollingStats(samples) for _ in channels] for addr in live}
+            next_pass = time.monotonic()
+            for _ in range(samples):
+                delay = next_pass - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_pass += period
+                for addr in live:
+                    dists = proto.read_distances(ser, addr)
+                    for k, ch in enumerate(channels):
+                        stats[addr][k].add(dists[ch] if dists else None)
+
+            for addr in live:
+                ch_stats = stats[addr]
+                scores = [score(s, tgt) for s, tgt in zip(ch_stats, targets)]
+                row = {"port": port, "addr": addr, "angle": angle, "denoise": denoise,
+                       "score": sum(scores) / len(scores),
+                       "std": max(s.std for s in ch_stats),
+                       "dropout": max(s.dropout_rate for s in ch_stats),
+                       "bias": max((abs(s.mean - tgt) for s, tgt in zip(ch_stats, targets)
+                                    if tgt is not None), default=0.0)}
+                out[addr]["results"].append(row)
+                log(f"[{port}] {addr:#04x} angle={angle} denoise={denoise}: score={row['score']:.1f} "
+                    f"std={row['std']:.1f} dropout={row['dropout']:.0%}")
+
+        cache = RegisterCache(ser)
+        for addr, entry in out.items():
+            if not entry["results"]:
+                continue
+            best = min(entry["results"], key=lambda r: r["score"])
+            entry["best"] = (best["angle"], best["denoise"])
+            if apply_best and proto.write_settings(ser, addr, *entry["best"]):
+                readback = cache.get(addr, ["angle", "denoise"], max_age=0)
+                entry["applied"] = (readback["angle"], readback["denoise"]) == entry["best"]
+            log(f"[{port}] {'✅' if entry['applied'] else '⚠️'} {addr:#04x}: best angle={best['angle']} "
+                f"denoise={best['denoise']} (score {best['score']:.1f})")
+    return out
+
+
+def tune(buses: dict, samples: int = 30, target=None, channels=(0, 1, 2, 3), settle: float = SETTLE,
+         baud: int = None, period: float = proto.POLL_INTERVAL, results_file: str = None, log=print) -> dict:
+    """Run ``sweep_bus`` on every ``{port: [addr, ...]}`` bus in parallel threads.
+
+    Returns ``{port: sweep result}``; the best settings are recorded under
+    ``"tuned"`` in the saved config and every scored combination is written
+    to ``results_file`` (default ``tune_results_<timestamp>.csv``).
+    """
+    channel_targets(target, channels)  # fail before any thread touches a bus
+    lock = threading.Lock()
+
+    def locked_log(msg):
+        with lock:
+            log(msg)
+
+    results = {}
+
+    def worker(port, addrs):
+        try:
+            results[port] = sweep_bus(port, addrs, samples, target, channels, settle, baud, period,
+                                      log=locked_log)
+        except OSError as e:
+            locked_log(f"[{port}] [ERROR] {e}")
+            results[port] = {}
+
+    threads = [threading.Thread(target=worker, args=(port, addrs), daemon=True) for port, addrs in buses.items()]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    rows = [row for res in results.values() for entry in res.values() for row in entry["results"]]
+    if rows:
+        results_file = results_file or f"tune_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        with open(results_file, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+            writer.writeheader()
+            writer.writerows(rows)
+        tuned = {f"{port}/{addr:#04x}": {"angle": entry["best"][0], "denoise": entry["best"][1]}
+                 for port, res in results.items() for addr, entry in res.items() if entry["best"]}
+        proto.update_config(tuned=tuned)
+    return results
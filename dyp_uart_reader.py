@@ -10,6 +10,8 @@ import matplotlib.pyplot as plt
 import matplotlib.animation as animation
 from collections import deque
 import statistics
+from log_pyramid import PyramidWriter, PyramidView, HistoryPlot
+from dyp_protocol import saved_baud, SampleClock
 
 # --- Modbus CRC16 calculation ---
 def modbus_crc16(data):
@@ -31,7 +33,7 @@ def build_modbus_command(addr=0x01, reg_addr=0x0106, reg_count=0x0004):
 
 # --- Configuration ---
 PORT = "COM13"
-BAUD = 9600
+BAUD = saved_baud(9600)
 POLL_INTERVAL = 0.2
 CHANNEL_LABELS = ["Channel 1", "Channel 2", "Channel 3", "Channel 4"]
 DISTANCE_THRESHOLD = 2000  # mm
@@ -49,9 +51,14 @@ class MultiChannelApp:
         self.data_vars = {}
         self.std_vars = {}
         self.history = {label: deque(maxlen=50) for label in CHANNEL_LABELS}
-        self.csv_file = open(f"sensor_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv", "w", newline="")
+        self.history_span = tk.IntVar(value=0)  # seconds of history to plot from the pyramid, 0 = last 50 samples
+        log_name = f"sensor_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        self.csv_file = open(log_name, "w", newline="")
         self.csv_writer = csv.writer(self.csv_file)
         self.csv_writer.writerow(["Time"] + CHANNEL_LABELS)
+        self.clock = SampleClock()
+        self.pyramid = PyramidWriter(log_name, CHANNEL_LABELS)
+        self.history_plot = HistoryPlot(PyramidView(log_name))
         self.build_gui()
         self.setup_plot()
 
@@ -75,6 +82,9 @@ class MultiChannelApp:
             ttk.Label(frm, textvariable=std).grid(column=2, row=i+1, sticky="w")
             ttk.Checkbutton(frm, text="Active", variable=self.active_channels[label]).grid(column=3, row=i+1, padx=10)
 
+        ttk.Label(frm, text="History (s):").grid(column=0, row=5, sticky="e")
+        ttk.Entry(frm, textvariable=self.history_span, width=7).grid(column=1, row=5, sticky="w")
+
     def setup_plot(self):
         self.fig, self.ax = plt.subplots()
         self.lines = {
@@ -89,6 +99,12 @@ class MultiChannelApp:
         self.ani = animation.FuncAnimation(self.fig, self.update_plot, interval=500)
 
     def update_plot(self, frame):
+        span = self.history_span.get()
+        if span > 0:
+            return self.update_history_plot(span)
+        self.history_plot.clear()
+        self.ax.set_xlim(0, 50)
+        self.ax.set_xlabel("Samples")
         for label, line in self.lines.items():
             if self.active_channels[label].get():
                 data = list(self.history[label])
@@ -102,6 +118,13 @@ class MultiChannelApp:
                 line.set_data([], [])
         return list(self.lines.values())
 
+    def update_history_plot(self, span):
+        # Long history comes from the on-disk pyramid at roughly one point per pixel
+        now = self.clock.elapsed(time.monotonic())
+        width = int(self.fig.get_figwidth() * self.fig.dpi)
+        active = [self.active_channels[label].get() for label in self.lines]
+        return self.history_plot.draw(self.ax, list(self.lines.values()), now - span, now, active, width)
+
     def open_serial(self):
         try:
             self.serial = serial.Serial(PORT, BAUD, timeout=0.3)
@@ -129,8 +152,10 @@ class MultiChannelApp:
 
     def read_loop(self):
         while self.running:
+            t_req = time.monotonic()
             distances = self.read_channels()
-            row = [datetime.now().strftime("%H:%M:%S")]
+            t = (t_req + time.monotonic()) / 2  # request/response midpoint
+            row = [self.clock.stamp(t)]
             if distances:
                 for i, label in enumerate(CHANNEL_LABELS):
                     if self.active_channels[label].get():
@@ -152,9 +177,11 @@ class MultiChannelApp:
                     self.data_vars[label].set("--- mm")
                     self.history[label].append(0)
                     self.std_vars[label].set("Std: ---")
-                    row.append("")
+                    row.append(0 if self.active_channels[label].get() else "")  # 0 = timeout
             self.csv_writer.writerow(row)
             self.csv_file.flush()
+            self.pyramid.append(self.clock.elapsed(t), row[1:])
+            self.pyramid.flush()
             time.sleep(POLL_INTERVAL)
 
     def start(self):
@@ -174,6 +201,7 @@ class MultiChannelApp:
         if self.serial and self.serial.is_open:
             self.serial.close()
         self.csv_file.close()
+        self.pyramid.close()
         self.root.quit()
 
 # --- Launch the app ---
@@ -183,4 +211,5 @@ def launch_app():
     root.protocol("WM_DELETE_WINDOW", app.close)
     root.mainloop()
 
-launch_app()
+if __name__ == '__main__':
+    launch_app()
@@ -0,0 +1,261 @@
+# Indexed catalog of recorded sensor logs with cached per-file statistics
+import argparse
+import csv
+import glob
+import os
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+
+CATALOG_FILE = "sensor_catalog.db"
+LOG_PATTERN = "sensor_log_*.csv"
+TIME_FORMATS = ("%H:%M:%S.%f", "%H:%M:%S")
+SCHEMA_VERSION = 3  # bump when the tables or their meaning change; the index is rebuilt from the CSVs
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    session TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    duration REAL,
+    samples INTEGER,
+    sampling_rate REAL,
+    min_interval REAL,
+    max_interval REAL,
+    mean_interval REAL
+);
+CREATE TABLE IF NOT EXISTS channels (
+    path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+    channel TEXT NOT NULL,
+    min REAL,
+    max REAL,
+    mean REAL,
+    std REAL,
+    valid INTEGER,
+    dropouts INTEGER,
+    inactive INTEGER,
+    PRIMARY KEY (path, channel)
+);
+CREATE INDEX IF NOT EXISTS channels_by_min ON channels (channel, min);
+CREATE INDEX IF NOT EXISTS channels_by_max ON channels (channel, max);
+"""
+
+
+# --- Parsing helpers ---
+
+def parse_time(text: str):
+    """Seconds since midnight for a ``Time`` cell, or None if unparseable."""
+    for fmt in TIME_FORMATS:
+        try:
+            t = datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+        return t.hour * 3600 + t.minute * 60 + t.second + t.microsecond / 1e6
+    return None
+
+
+def session_from_name(path: str):
+    """Recording start encoded in ``sensor_log_YYYYmmdd_HHMMSS*.csv``, as ISO text."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    parts = stem.split("_")
+    if len(parts) >= 4:
+        try:
+            return datetime.strptime(parts[2] + parts[3], "%Y%m%d%H%M%S").isoformat()
+        except ValueError:
+            pass
+    return None
+
+
+def channel_name(channel) -> str:
+    """Accept ``3`` or ``"Channel 3"`` and return the CSV column label."""
+    if isinstance(channel, int) or str(channel).isdigit():
+        return f"Channel {int(channel)}"
+    return str(channel)
+
+
+def summarize_log(path: str):
+    """Parse one CSV once and return (file summary, {channel: summary}).
+
+    Readings of 0 are what the readers write for timeouts and out-of-range
+    echoes; they are counted as dropouts. Empty cells are rows where the
+    channel was switched to Inactive and are counted separately, except
+    rows where every channel is empty: older recordings wrote those for a
+    read timeout, so they count as dropouts too. All of these are excluded
+    from the min/max/mean/std.
+    """
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        rows = [row for row in reader if row]
+    if not header:
+        header = ["Time"]
+    channels = header[1:]
+
+    times = np.array([parse_time(row[0]) if row[0] else None for row in rows], dtype=float)
+    values = np.full((len(rows), len(channels)), np.nan)
+    for i, row in enumerate(rows):
+        for j, cell in enumerate(row[1:len(channels) + 1]):
+            if cell:
+                try:
+                    values[i, j] = float(cell)
+                except ValueError:
+                    pass
+
+    times = times[~np.isnan(times)]
+    diffs = np.diff(times)
+    diffs[diffs < 0] += 86400  # recording crossed midnight
+    duration = float(diffs.sum()) if len(diffs) else 0.0
+
+    summary = {
+        "session": session_from_name(path),
+        "start_time": rows[0][0] if rows else None,
+        "end_time": rows[-1][0] if rows else None,
+        "duration": duration,
+        "samples": len(rows),
+        "sampling_rate": len(diffs) / duration if duration > 0 else None,
+        "min_interval": float(diffs.min()) if len(diffs) else None,
+        "max_interval": float(diffs.max()) if len(diffs) else None,
+        "mean_interval": float(diffs.mean()) if len(diffs) else None,
+    }
+
+    valid = values > 0
+    empty = np.isnan(values)
+    empty &= ~empty.all(axis=1, keepdims=True)  # whole-row blanks are timeouts
+    per_channel = {}
+    for j, label in enumerate(channels):
+        col = values[valid[:, j], j]
+        per_channel[label] = {
+            "min": float(col.min()) if len(col) else None,
+            "max": float(col.max()) if len(col) else None,
+            "mean": float(col.mean()) if len(col) else None,
+            "std": float(col.std(ddof=1)) if len(col) > 1 else None,
+            "valid": int(len(col)),
+            "dropouts": int(len(rows) - len(col) - empty[:, j].sum()),
+            "inactive": int(empty[:, j].sum()),
+        }
+    return summary, per_channel
+
+
+# --- Catalog ---
+
+class LogCatalog:
+    """SQLite index of ``sensor_log_*.csv`` files in a directory.
+
+    ``refresh()`` only re-parses files whose size or mtime changed since the
+    last scan, so queries never need to touch the CSVs themselves.
+    """
+
+    def __init__(self, log_dir: str = ".", db_path: str = None, pattern: str = LOG_PATTERN):
+        self.log_dir = log_dir
+        self.pattern = pattern
+        self.db_path = db_path or os.path.join(log_dir, CATALOG_FILE)
+        self.db = sqlite3.connect(self.db_path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA foreign_keys = ON")
+        if self.db.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.db.executescript("DROP TABLE IF EXISTS channels; DROP TABLE IF EXISTS files;")
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.db.executescript(SCHEMA)
+
+    def refresh(self) -> int:
+        """Bring the index up to date with the directory; returns files re-parsed."""
+        on_disk = {}
+        for path in glob.glob(os.path.join(self.log_dir, "**", self.pattern), recursive=True):
+            st = os.stat(path)
+            on_disk[os.path.relpath(path, self.log_dir)] = (st.st_mtime, st.st_size)
+
+        known = {row["path"]: (row["mtime"], row["size"])
+                 for row in self.db.execute("SELECT path, mtime, size FROM files")}
+
+        with self.db:
+            for path in known.keys() - on_disk.keys():
+                self.db.execute("DELETE FROM files WHERE path = ?", (path,))
+
+            updated = 0
+            for path, (mtime, size) in sorted(on_disk.items()):
+                if known.get(path) == (mtime, size):
+                    continue
+                try:
+                    summary, per_channel = summarize_log(os.path.join(self.log_dir, path))
+                except (OSError, csv.Error, UnicodeDecodeError) as e:
+                    print(f"[SKIP] {path}: {e}")
+                    continue
+                self.db.execute("DELETE FROM files WHERE path = ?", (path,))
+                self.db.execute(
+                    "INSERT INTO files (path, mtime, size, session, start_time, end_time, duration, samples,"
+                    " sampling_rate, min_interval, max_interval, mean_interval)"
+                    " VALUES (:path, :mtime, :size, :session, :start_time, :end_time, :duration, :samples,"
+                    " :sampling_rate, :min_interval, :max_interval, :mean_interval)",
+                    dict(summary, path=path, mtime=mtime, size=size),
+                )
+                self.db.executemany(
+                    "INSERT INTO channels (path, channel, min, max, mean, std, valid, dropouts, inactive)"
+                    " VALUES (:path, :channel, :min, :max, :mean, :std, :valid, :dropouts, :inactive)",
+                    [dict(stats, path=path, channel=label) for label, stats in per_channel.items()],
+                )
+                updated += 1
+        return updated
+
+    def sessions(self):
+        """All indexed files, oldest first."""
+        return [dict(row) for row in self.db.execute("SELECT * FROM files ORDER BY session, path")]
+
+    def channel_stats(self, path: str):
+        """Per-channel summary for one indexed file."""
+        rows = self.db.execute("SELECT * FROM channels WHERE path = ? ORDER BY channel", (path,))
+        return {row["channel"]: dict(row) for row in rows}
+
+    def find(self, channel, below: float = None, above: float = None, max_dropouts: int = None):
+        """Files where ``channel`` saw a reading below/above the given distance (mm)."""
+        query = ("SELECT f.*, c.min, c.max, c.mean, c.std, c.dropouts, c.inactive FROM channels c"
+                 " JOIN files f ON f.path = c.path WHERE c.channel = ?")
+        params = [channel_name(channel)]
+        if below is not None:
+            query += " AND c.min < ?"
+            params.append(below)
+        if above is not None:
+            query += " AND c.max > ?"
+            params.append(above)
+        if max_dropouts is not None:
+            query += " AND c.dropouts <= ?"
+            params.append(max_dropouts)
+        query += " ORDER BY f.session, f.path"
+        return [dict(row) for row in self.db.execute(query, params)]
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Index sensor_log_*.csv files and query their statistics.")
+    parser.add_argument("log_dir", nargs="?", default=".", help="directory holding the recordings")
+    parser.add_argument("--db", help=f"index file (default: <log_dir>/{CATALOG_FILE})")
+    parser.add_argument("--channel", help="channel number or label to filter on")
+    parser.add_argument("--below", type=float, help="only files where the channel read below this (mm)")
+    parser.add_argument("--above", type=float, help="only files where the channel read above this (mm)")
+    args = parser.parse_args(argv)
+
+    with LogCatalog(args.log_dir, args.db) as catalog:
+        updated = catalog.refresh()
+        print(f"Indexed {updated} new or changed file(s).")
+        if args.channel:
+            rows = catalog.find(args.channel, below=args.below, above=args.above)
+        else:
+            rows = catalog.sessions()
+        for row in rows:
+            rate = f"{row['sampling_rate']:.2f} Hz" if row["sampling_rate"] else "--- Hz"
+            print(f"{row['path']:<50} {row['samples']:>7} samples  {row['duration']:>8.1f} s  {rate}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+# Multi-resolution min/max/mean pyramid stored next to each sensor log
+import argparse
+import csv
+import json
+import os
+
+import numpy as np
+
+LEVELS = (1, 16, 256, 4096)
+META_FILE = "meta.json"
+
+
+def pyramid_dir(csv_path: str) -> str:
+    """``sensor_log_X.csv`` -> ``sensor_log_X.pyr``"""
+    return os.path.splitext(csv_path)[0] + ".pyr"
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class PyramidWriter:
+    """Append samples to a recording's pyramid as they are logged.
+
+    Every level is a flat float64 file of fixed-size records
+    ``[t, min_1..min_C, max_1..max_C, mean_1..mean_C]`` where ``t`` is the
+    time of the first sample in the block (seconds since recording start).
+    Level 1 holds the raw samples; level N summarises N raw samples. Empty
+    cells (inactive channels) and readings of 0 (timeouts and out-of-range
+    echoes, counted as dropouts by log_catalog) are stored as NaN and
+    ignored by the reductions.
+    """
+
+    def __init__(self, csv_path: str, channels, levels=LEVELS):
+        self.path = pyramid_dir(csv_path)
+        self.channels = list(channels)
+        self.levels = tuple(levels)
+        os.makedirs(self.path, exist_ok=True)
+        with open(os.path.join(self.path, META_FILE), "w") as f:
+            json.dump({"channels": self.channels, "levels": self.levels}, f)
+        self.files = {lvl: open(os.path.join(self.path, f"level_{lvl}.bin"), "wb") for lvl in self.levels}
+        n = len(self.channels)
+        self.acc = {lvl: self._empty_block(n) for lvl in self.levels if lvl > 1}
+
+    @staticmethod
+    def _empty_block(n):
+        return {"t": None, "count": 0, "min": np.full(n, np.inf), "max": np.full(n, -np.inf),
+                "sum": np.zeros(n), "valid": np.zeros(n)}
+
+    def append(self, t: float, values) -> None:
+        v = np.array([_to_float(x) for x in values], dtype=float)
+        v[v <= 0] = np.nan  # dropouts must not drag min/mean towards 0
+        if 1 in self.files:
+            np.concatenate(([t], v, v, v)).tofile(self.files[1])
+        ok = ~np.isnan(v)
+        for lvl, block in self.acc.items():
+            if block["t"] is None:
+                block["t"] = t
+            block["count"] += 1
+            block["min"][ok] = np.minimum(block["min"][ok], v[ok])
+            block["max"][ok] = np.maximum(block["max"][ok], v[ok])
+            block["sum"][ok] += v[ok]
+            block["valid"][ok] += 1
+            if block["count"] == lvl:
+                self._emit(lvl)
+
+    def _emit(self, lvl: int) -> None:
+        block = self.acc[lvl]
+        if not block["count"]:
+            return
+        seen = block["valid"] > 0
+        lo = np.where(seen, block["min"], np.nan)
+        hi = np.where(seen, block["max"], np.nan)
+        mean = np.divide(block["sum"], block["valid"], out=np.full_like(block["sum"], np.nan), where=seen)
+        np.concatenate(([block["t"]], lo, hi, mean)).tofile(self.files[lvl])
+        self.acc[lvl] = self._empty_block(len(self.channels))
+
+    def flush(self) -> None:
+        for f in self.files.values():
+            f.flush()
+
+    def close(self) -> None:
+        for lvl in self.acc:
+            self._emit(lvl)  # partial tail blocks
+        for f in self.files.values():
+            f.close()
+
+
+class PyramidView:
+    """Read side of a pyramid: picks the coarsest level that still gives
+    roughly one record per pixel for the requested time range."""
+
+    def __init__(self, csv_path: str):
+        self.path = pyramid_dir(csv_path)
+        with open(os.path.join(self.path, META_FILE)) as f:
+            meta = json.load(f)
+        self.channels = meta["channels"]
+        self.levels = tuple(meta["levels"])
+        self.record = 1 + 3 * len(self.channels)
+
+    def level_data(self, lvl: int) -> np.ndarray:
+        """Memory-mapped (n, 1 + 3C) records of one level, safe while it is being written."""
+        fname = os.path.join(self.path, f"level_{lvl}.bin")
+        n = os.path.getsize(fname) // (8 * self.record) if os.path.exists(fname) else 0
+        if n == 0:
+            return np.empty((0, self.record))
+        return np.memmap(fname, dtype=np.float64, mode="r", shape=(n, self.record))
+
+    def pick_level(self, t0: float, t1: float, width: int) -> int:
+        raw = self.level_data(self.levels[0])
+        i0, i1 = np.searchsorted(raw[:, 0], [t0, t1]) if len(raw) else (0, 0)
+        samples = (i1 - i0) * self.levels[0]
+        chosen = self.levels[0]
+        for lvl in self.levels:
+            if samples / lvl >= width:
+                chosen = lvl
+            else:
+                break
+        return chosen
+
+    def query(self, t0: float = None, t1: float = None, width: int = 1000, level: int = None) -> dict:
+        """Records covering [t0, t1] as ``{"level", "t", "min", "max", "mean"}``.
+
+        ``min``/``max``/``mean`` are (n, C) arrays; plotting ``min`` and ``max``
+        as an envelope keeps spikes visible at any zoom.
+        """
+        t0 = -np.inf if t0 is None else t0
+        t1 = np.inf if t1 is None else t1
+        lvl = level or self.pick_level(t0, t1, width)
+        data = self.level_data(lvl)
+        # include the block that started before t0 but still covers it
+        i0 = max(np.searchsorted(data[:, 0], t0) - 1, 0) if len(data) else 0
+        i1 = np.searchsorted(data[:, 0], t1, side="right") if len(data) else 0
+        rows = np.asarray(data[i0:i1])
+        c = len(self.channels)
+        return {"level": lvl, "t": rows[:, 0], "min": rows[:, 1:1 + c],
+                "max": rows[:, 1 + c:1 + 2 * c], "mean": rows[:, 1 + 2 * c:]}
+
+
+class HistoryPlot:
+    """Draws pyramid queries onto existing matplotlib lines, one per channel.
+
+    The line shows the mean; the min/max envelope is shaded behind it so
+    short spikes stay visible at coarse levels.
+    """
+
+    def __init__(self, view: PyramidView):
+        self.view = view
+        self.bands = []
+
+    def clear(self) -> None:
+        for band in self.bands:
+            band.remove()
+        self.bands = []
+
+    def draw(self, ax, lines, t0: float, t1: float, active=None, width: int = 1000) -> list:
+        """Plot [t0, t1] with x relative to ``t1``; ``active`` masks channels off. Returns the artists."""
+        view = self.view.query(t0, t1, width)
+        x = view["t"] - t1
+        self.clear()
+        for i, line in enumerate(lines):
+            if active is None or active[i]:
+                line.set_data(x, view["mean"][:, i])
+                self.bands.append(ax.fill_between(x, view["min"][:, i], view["max"][:, i],
+                                                  color=line.get_color(), alpha=0.25, linewidth=0))
+            else:
+                line.set_data([], [])
+        ax.set_xlim(t0 - t1, 0)
+        ax.set_xlabel(f"Seconds (level {view['level']}x)")
+        return list(lines) + self.bands
+
+
+def build_pyramid(csv_path: str, levels=LEVELS) -> PyramidView:
+    """Create the pyramid for an existing recording (e.g. logs from before it was written live)."""
+    from log_catalog import parse_time
+
+    out = pyramid_dir(csv_path)
+    for lvl in levels:
+        fname = os.path.join(out, f"level_{lvl}.bin")
+        if os.path.exists(fname):
+            os.remove(fname)
+    with open(csv_path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        writer = PyramidWriter(csv_path, header[1:], levels)
+        start = prev = None
+        offset = 0.0
+        for row in reader:
+            if not row:
+                continue
+            t = parse_time(row[0])
+            if t is None:
+                continue
+            if prev is not None and t < prev:
+                offset += 86400  # crossed midnight
+            prev = t
+            if start is None:
+                start = t
+            writer.append(t + offset - start, row[1:])
+        writer.close()
+    return PyramidView(csv_path)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Build min/max/mean pyramids for recorded sensor logs.")
+    parser.add_argument("csv", nargs="+", help="sensor_log_*.csv files")
+    args = parser.parse_args(argv)
+    for path in args.csv:
+        view = build_pyramid(path)
+        sizes = ", ".join(f"{lvl}x: {len(view.level_data(lvl))}" for lvl in view.levels)
+        print(f"{path} -> {view.path} ({sizes})")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ from tkinter import messagebox
 from math import radians
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from dyp_protocol import saved_baud
 
 # --- CRC and command utils ---
 
@@ -100,6 +101,6 @@ class SonarMapApp:
 
 if __name__ == "__main__":
     root = tk.Tk()
-    app = SonarMapApp(root)
+    app = SonarMapApp(root, baud=saved_baud())
     root.protocol("WM_DELETE_WINDOW", app.close)
     root.mainloop()
@@ -0,0 +1,39 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from adaptive_poll import AdaptivePoller, frame_time
+
+
+def test_quiet_channels_back_off_and_movement_resets():
+    poller = AdaptivePoller(min_interval=0.1, max_interval=0.4, change_mm=20)
+    assert poller.observe(1, [500, 500, 500, 500], now=0) == 0.1
+    assert poller.observe(1, [505, 500, 500, 500], now=1) == 0.2
+    assert poller.observe(1, [510, 500, 500, 500], now=2) == 0.4
+    assert poller.observe(1, [510, 500, 500, 500], now=3) == 0.4
+    assert poller.observe(1, [510, 450, 500, 500], now=4) == 0.1
+
+
+def test_trigger_pulls_a_quiet_sensor_forward():
+    poller = AdaptivePoller(min_interval=0.1, max_interval=2.0, backoff=100)
+    poller.observe(1, [500] * 4, now=0)
+    poller.observe(1, [500] * 4, now=0)
+    assert poller.next_sensor(now=0)[1] == 2.0
+    poller.trigger(1, 2)
+    assert poller.interval(1) == 0.1
+    assert poller.next_sensor()[1] <= 0.1
+
+
+def test_sensors_sharing_a_bus_never_outrun_it():
+    bus = frame_time(9600)
+    poller = AdaptivePoller(min_interval=0.001, bus_interval=bus)
+    for addr in (1, 2, 3):
+        poller.observe(addr, [500] * 4, now=0.0)
+    now, starts = 0.0, []
+    for _ in range(9):
+        addr, delay = poller.next_sensor(now)
+        now += delay
+        starts.append(now)
+        poller.observe(addr, [500] * 4, now=now)
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    assert min(gaps) >= bus - 1e-9
@@ -0,0 +1,80 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dyp
+from adaptive_poll import AdaptivePoller
+from dyp_alarm import AlarmEngine, AlarmRule, channel_rules
+
+
+def feed(engine, frames):
+    events = []
+    for i, dists in enumerate(frames):
+        events += engine.evaluate(float(i), dists)
+    return events
+
+
+def test_raise_after_debounce_and_clear_with_hysteresis():
+    engine = AlarmEngine(channel_rules(near_mm=200, hysteresis_mm=50, debounce=2))
+    seen = []
+    engine.on(seen.append)
+
+    assert feed(engine, [[500, 500, 500, 500], [150, 500, 500, 500]]) == []
+    (raised,) = feed(engine, [[140, 500, 500, 500]])
+    assert (raised["rule"], raised["state"], raised["channel"], raised["distance"]) == ("Channel 1", "alarm", 1, 140)
+
+    # inside the hysteresis band nothing clears
+    assert feed(engine, [[220, 500, 500, 500]] * 3) == []
+    events = feed(engine, [[300, 500, 500, 500]] * 2)
+    assert [(e["state"], e["channel"]) for e in events] == [("clear", 1)]
+    assert seen == [raised] + events
+
+
+def test_dropouts_clear_and_report_the_rules_channel():
+    engine = AlarmEngine(channel_rules(near_mm=200, debounce=1))
+    feed(engine, [[500, 500, 150, 500]])
+    (cleared,) = feed(engine, [[500, 500, 0, 500]])  # 0 = nothing in range
+    assert cleared["state"] == "clear"
+    assert cleared["distance"] is None
+    assert cleared["channel"] == 3
+
+
+def test_timeouts_are_ignored():
+    engine = AlarmEngine(channel_rules(near_mm=200, debounce=2))
+    assert feed(engine, [[100, 500, 500, 500], None, [100, 500, 500, 500]])[0]["state"] == "alarm"
+
+
+def test_zone_reports_nearest_member():
+    engine = AlarmEngine([AlarmRule("Front", (1, 2), 200, 250, 1, 1)])
+    (raised,) = feed(engine, [[50, 180, 120, 500]])
+    assert (raised["channel"], raised["distance"]) == (3, 120)
+    (cleared,) = feed(engine, [[50, 0, 0, 500]])
+    assert (cleared["state"], cleared["channel"]) == ("clear", 2)
+
+
+def test_alarm_speeds_up_the_poller_and_clear_does_not():
+    args = dyp.build_parser().parse_args(["stream", "-b", "9600", "--alarm", "200", "--debounce", "1", "--adaptive",
+                                          "--min-interval", "0.05", "--max-interval", "2"])
+    poller = dyp.make_poller(args)
+    engine = dyp.make_alarms(args, poller)
+    for _ in range(10):
+        poller.observe(args.addr, [500] * 4, now=0)
+    assert poller.interval(args.addr) == 2
+
+    engine.evaluate(0.0, [500, 150, 500, 500])
+    assert poller.channels[args.addr][1]["interval"] == 0.05
+    assert poller.interval(args.addr) == 0.05
+
+    for _ in range(10):
+        poller.observe(args.addr, [500, 150, 500, 500], now=0)
+    engine.evaluate(1.0, [500, 500, 500, 500])
+    assert poller.interval(args.addr) == 2
+
+
+def test_trigger_registers_an_unseen_sensor():
+    # the GUI's poller only learns a sensor from observe(), which it skips unless Adaptive Rate is on
+    poller = AdaptivePoller(min_interval=0.05)
+    engine = AlarmEngine(channel_rules(near_mm=200, debounce=1))
+    engine.on(lambda e: poller.trigger(2, e["channel"] - 1))
+    assert engine.evaluate(0.0, [500, 500, 100, 500])[0]["state"] == "alarm"
+    assert poller.interval(2) == 0.05
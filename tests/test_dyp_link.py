@@ -0,0 +1,109 @@
+import os
+import struct
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dyp_link
+import dyp_protocol as proto
+
+RATES = {code: baud for baud, code in proto.BAUD_CODES.items()}
+
+
+class FakeSensor:
+    def __init__(self, addr, baud=9600, supported=None, sticky=False):
+        self.addr = addr
+        self.baud = baud
+        self.supported = set(proto.BAUD_CODES) if supported is None else set(supported)
+        self.sticky = sticky  # takes one rate change and then ignores REG_BAUD
+        self.changes = []
+
+
+class FakeBus:
+    """Stands in for serial.Serial: a sensor only hears and answers at its own rate."""
+
+    def __init__(self, *sensors):
+        self.sensors = {s.addr: s for s in sensors}
+        self.baudrate = proto.DEFAULT_BAUD
+        self.timeout = 0.3
+        self.rx = b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def reset_input_buffer(self):
+        self.rx = b""
+
+    def read(self, n):
+        out, self.rx = self.rx[:n], self.rx[n:]
+        return out
+
+    def write(self, frame):
+        addr, fn, reg, value = struct.unpack(">BBHH", frame[:6])
+        sensor = self.sensors.get(addr)
+        if sensor is None or sensor.baud != self.baudrate:
+            return
+        if fn == 0x03:
+            body = struct.pack(">BBBH", addr, 3, 2, addr)
+            self.rx += body + proto.modbus_crc16(body)
+        elif fn == 0x06 and reg == proto.REG_BAUD:
+            self.rx += frame
+            new = RATES[value]
+            if new in sensor.supported and not (sensor.sticky and sensor.changes):
+                sensor.changes.append(new)
+                sensor.baud = new
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    saved = {}
+    monkeypatch.setattr(dyp_link.time, "sleep", lambda s: None)
+    monkeypatch.setattr(proto, "update_config", lambda **values: saved.update(values))
+
+    def make(*sensors):
+        fake = FakeBus(*sensors)
+        monkeypatch.setattr(proto, "open_port", lambda *a, **k: fake)
+        return fake, saved
+    return make
+
+
+def test_detect_finds_each_sensors_rate(bus):
+    fake, _ = bus(FakeSensor(1, 38400), FakeSensor(2, 9600))
+    assert dyp_link.detect_baud(fake, 1) == 38400
+    assert dyp_link.scan_bus("X", [1, 2, 3]) == {1: 38400, 2: 9600, 3: None}
+
+
+def test_upgrade_moves_the_bus_to_the_fastest_rate(bus):
+    fake, saved = bus(FakeSensor(1), FakeSensor(2))
+    assert dyp_link.negotiate("X", [1, 2, 3], log=lambda m: None) == {1: 115200, 2: 115200, 3: None}
+    assert saved == {"baud": 115200}
+
+
+def test_partial_support_lands_on_the_fastest_common_rate(bus):
+    fast, slow = FakeSensor(1), FakeSensor(2, supported=[9600, 19200, 38400, 57600])
+    fake, saved = bus(fast, slow)
+    assert dyp_link.negotiate("X", [1, 2], log=lambda m: None) == {1: 57600, 2: 57600}
+    assert fast.changes == [115200, 9600, 76800, 9600, 57600]  # rolled back before each slower try
+    assert saved == {"baud": 57600}
+
+
+def test_sensor_that_never_switches_rolls_the_bus_back(bus):
+    fast, stuck = FakeSensor(1), FakeSensor(2, supported=[9600])
+    fake, saved = bus(fast, stuck)
+    assert dyp_link.negotiate("X", [1, 2], log=lambda m: None) == {1: 9600, 2: 9600}
+    assert fast.baud == stuck.baud == 9600
+    assert saved == {"baud": 9600}
+
+
+def test_failed_rollback_is_reported_and_not_saved(bus):
+    one_way, stuck = FakeSensor(1, sticky=True), FakeSensor(2, supported=[9600])
+    fake, saved = bus(one_way, stuck)
+    messages = []
+    result = dyp_link.negotiate("X", [1, 2], log=messages.append)
+    assert result == {1: 115200, 2: 9600}
+    assert any("rollback to 9600 not verified" in m for m in messages)
+    assert saved == {}
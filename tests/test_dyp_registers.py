@@ -0,0 +1,82 @@
+import os
+import struct
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dyp_protocol as proto
+from dyp_registers import REGISTER_MAP, RegisterCache, plan_reads
+
+
+class FakeSensor:
+    """Stands in for serial.Serial with one sensor that rejects reads touching unmapped addresses."""
+
+    def __init__(self, addr=1):
+        self.addr = addr
+        self.regs = {reg.addr + i: 100 + i for reg in REGISTER_MAP.values() for i in range(reg.count)}
+        self.requests = []
+        self.rx = b""
+
+    def reset_input_buffer(self):
+        self.rx = b""
+
+    def read(self, n):
+        out, self.rx = self.rx[:n], self.rx[n:]
+        return out
+
+    def write(self, frame):
+        addr, fn, reg, value = struct.unpack(">BBHH", frame[:6])
+        self.requests.append((fn, reg, value))
+        if addr != self.addr:
+            return
+        if fn == 0x03:
+            if any(reg + i not in self.regs for i in range(value)):
+                return
+            body = struct.pack(f">BBB{value}H", addr, 3, 2 * value, *(self.regs[reg + i] for i in range(value)))
+            self.rx += body + proto.modbus_crc16(body)
+        elif fn == 0x06:
+            self.regs[reg] = value
+            self.rx += frame
+
+
+CONFIG = ["address", "baud", "mode", "angle", "denoise"]
+
+
+def test_plan_reads_coalesces_within_gap():
+    assert plan_reads(CONFIG) == [(proto.REG_ADDRESS, proto.REG_DENOISE - proto.REG_ADDRESS + 1)]
+    assert plan_reads(CONFIG + ["distance"]) == [(proto.REG_DISTANCE, 4),
+                                                  (proto.REG_ADDRESS, proto.REG_DENOISE - proto.REG_ADDRESS + 1)]
+    assert plan_reads(CONFIG, max_gap=0) == [(proto.REG_ADDRESS, 2), (proto.REG_MODE, 2), (proto.REG_DENOISE, 1)]
+    assert plan_reads(CONFIG, max_block=4) == [(proto.REG_ADDRESS, 2), (proto.REG_MODE, 2), (proto.REG_DENOISE, 1)]
+
+
+def test_rejected_block_falls_back_to_exact_spans():
+    ser = FakeSensor()
+    cache = RegisterCache(ser)
+    vals = cache.get(1, CONFIG)
+    assert vals == {"address": 100, "baud": 100, "mode": 100, "angle": 100, "denoise": 100}
+    reads = [(reg, count) for fn, reg, count in ser.requests if fn == 0x03]
+    assert reads == [(proto.REG_ADDRESS, proto.REG_DENOISE - proto.REG_ADDRESS + 1),
+                     (proto.REG_ADDRESS, 2), (proto.REG_MODE, 2), (proto.REG_DENOISE, 1)]
+    assert cache.frames == 4
+
+
+def test_fresh_values_come_from_cache_and_max_age_zero_rereads():
+    ser = FakeSensor()
+    ser.regs.update({a: 0 for a in range(proto.REG_ADDRESS, proto.REG_DENOISE + 1) if a not in ser.regs})
+    cache = RegisterCache(ser, max_age=60)
+    cache.get(1, CONFIG)
+    assert cache.frames == 1
+    cache.get(1, CONFIG)
+    assert cache.frames == 1
+    ser.regs[proto.REG_ANGLE] = 3
+    assert cache.get(1, ["angle"], max_age=0) == {"angle": 3}
+    assert cache.frames == 2
+
+
+def test_write_through_and_unreachable_sensor():
+    ser = FakeSensor()
+    cache = RegisterCache(ser)
+    assert cache.write(1, "denoise", 5)
+    assert cache.get(1, ["denoise"]) == {"denoise": 5}
+    assert cache.frames == 1  # served from the written value
+    assert cache.get(7, ["angle", "distance"]) == {"angle": None, "distance": [None] * 4}
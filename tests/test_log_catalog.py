@@ -0,0 +1,37 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from log_catalog import LogCatalog, summarize_log
+
+LOG = """Time,Channel 1,Channel 2
+10:00:00.000,100,
+10:00:00.200,,
+10:00:00.400,0,
+10:00:00.600,120,
+"""
+
+
+def write_log(tmp_path, name="sensor_log_20250101_100000.csv"):
+    path = tmp_path / name
+    path.write_text(LOG)
+    return path
+
+
+def test_zero_and_blank_row_are_dropouts_blank_cell_is_inactive(tmp_path):
+    summary, per_channel = summarize_log(str(write_log(tmp_path)))
+    assert summary["samples"] == 4
+    ch1, ch2 = per_channel["Channel 1"], per_channel["Channel 2"]
+    assert (ch1["valid"], ch1["dropouts"], ch1["inactive"]) == (2, 2, 0)
+    assert (ch1["min"], ch1["max"]) == (100, 120)
+    assert (ch2["valid"], ch2["dropouts"], ch2["inactive"]) == (0, 1, 3)
+
+
+def test_find_filters_on_dropouts(tmp_path):
+    write_log(tmp_path)
+    with LogCatalog(str(tmp_path)) as catalog:
+        assert catalog.refresh() == 1
+        assert catalog.refresh() == 0
+        assert len(catalog.find(1, below=110)) == 1
+        assert catalog.find(1, max_dropouts=1) == []
+        assert len(catalog.find(2, max_dropouts=1)) == 1
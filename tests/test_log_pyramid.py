@@ -0,0 +1,51 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from log_pyramid import HistoryPlot, PyramidView, PyramidWriter
+
+
+def write(csv_path, samples, levels=(1, 4)):
+    writer = PyramidWriter(str(csv_path), ["Channel 1", "Channel 2"], levels)
+    for i, row in enumerate(samples):
+        writer.append(float(i), row)
+    writer.close()
+    return PyramidView(str(csv_path))
+
+
+def test_levels_ignore_dropouts_and_blanks(tmp_path):
+    view = write(tmp_path / "log.csv", [[100, ""], [0, ""], [300, ""], [200, ""], [50, 10]])
+    coarse = view.query(level=4)
+    assert coarse["t"].tolist() == [0.0, 4.0]
+    assert coarse["min"][0, 0] == 100 and coarse["max"][0, 0] == 300 and coarse["mean"][0, 0] == 200
+    assert np.isnan(coarse["mean"][0, 1])
+    assert np.isnan(view.query(level=1)["min"][1, 0])  # the 0 reading
+
+
+def test_reused_log_name_starts_a_fresh_pyramid(tmp_path):
+    write(tmp_path / "log.csv", [[100, 100]] * 8)
+    view = write(tmp_path / "log.csv", [[200, 200]] * 2)
+    assert len(view.level_data(1)) == 2
+    assert view.query(level=1)["min"][:, 0].tolist() == [200, 200]
+
+
+def test_history_plot_draws_mean_and_replaces_envelopes(tmp_path):
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    view = write(tmp_path / "log.csv", [[100, 300], [140, 320]] * 4)
+    fig, ax = plt.subplots()
+    lines = [ax.plot([], [])[0] for _ in range(2)]
+    plot = HistoryPlot(view)
+    plot.draw(ax, lines, 0, 8, active=[True, False], width=100)
+    plot.draw(ax, lines, 0, 8, active=[True, False], width=100)
+    assert len(ax.collections) == 1
+    assert lines[0].get_ydata().tolist() == [100, 140] * 4
+    assert len(lines[1].get_xdata()) == 0
+    plot.clear()
+    assert len(ax.collections) == 0
+    plt.close(fig)
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from timebase import log_times, resample
+
+
+def test_two_rates_land_on_one_grid():
+    fast = (np.arange(0, 2.01, 0.1), 500 + np.arange(0, 2.01, 0.1) * 100)
+    slow = (np.arange(0, 2.01, 0.5), np.column_stack([300 + np.arange(5) * 10.0, 300 + np.arange(5) * 20.0]))
+    grid, values, mask = resample([fast, slow], period=0.25)
+    assert np.allclose(grid, np.arange(0, 2.01, 0.25))
+    assert values.shape == mask.shape == (9, 3)
+    assert mask.all()
+    assert np.allclose(values[:, 0], 500 + grid * 100)
+    assert np.allclose(values[:, 2], 300 + grid * 40)
+
+
+def test_gaps_are_masked_not_bridged():
+    t = np.array([0.0, 0.25, 0.5, 0.75, 2.0, 2.25, 2.5])
+    grid, values, mask = resample([(t, 400 + t * 10)], period=0.25)
+    inside_gap = (grid > 0.75) & (grid < 2.0)
+    assert not mask[inside_gap, 0].any()
+    assert np.isnan(values[inside_gap, 0]).all()
+    assert mask[~inside_gap, 0].all()
+
+
+def test_dropouts_are_masked_and_outside_span_is_invalid():
+    t = np.arange(0, 1.01, 0.1)
+    v = np.full(len(t), 500.0)
+    v[5] = 0  # timeout
+    grid, values, mask = resample([(t, v)], period=0.1, t0=-0.2, t1=1.2, max_gap=0.15)
+    assert not mask[grid < -1e-9].any() and not mask[grid > 1 + 1e-9].any()
+    assert not mask[np.isclose(grid, 0.5), 0].any()
+    assert np.allclose(values[mask[:, 0], 0], 500)
+    # with dropout_value=None a 0 is an ordinary reading
+    _, values, mask = resample([(t, v)], period=0.1, dropout_value=None)
+    assert mask.all() and values[5, 0] == 0
+
+
+def test_log_times_unwrap_midnight():
+    assert log_times(["23:59:59.500", "00:00:00.250"]).tolist() == [86399.5, 86400.25]
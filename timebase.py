@@ -0,0 +1,82 @@
+# Resampling of sensor streams onto a common uniform time grid
+import numpy as np
+
+from log_catalog import parse_time
+
+
+def resample(streams, period: float, t0: float = None, t1: float = None,
+             max_gap: float = None, dropout_value: float = 0):
+    """Interpolate several streams onto one uniform grid.
+
+    ``streams`` is a list of ``(t, values)`` pairs: ``t`` is a 1-D array of
+    sample times on a shared clock (e.g. ``SampleClock`` monotonic seconds)
+    and ``values`` an (n,) or (n, C) array. Each stream may have its own
+    rate and jitter. Returns ``(grid, values, mask)`` where ``values`` and
+    ``mask`` are (len(grid), total channels). ``mask`` is False where the
+    nearest valid samples on either side are more than ``max_gap`` apart
+    (default: 2.5x the stream's median interval), outside the stream's time
+    span, or where the reading equals ``dropout_value``; ``values`` is NaN
+    there so gaps are never silently bridged.
+    """
+    prepared = []
+    for t, v in streams:
+        t = np.asarray(t, dtype=float)
+        v = np.asarray(v, dtype=float)
+        if v.ndim == 1:
+            v = v[:, None]
+        order = np.argsort(t, kind="stable")
+        prepared.append((t[order], v[order]))
+
+    starts = [t[0] for t, _ in prepared if len(t)]
+    ends = [t[-1] for t, _ in prepared if len(t)]
+    t0 = min(starts) if t0 is None else t0
+    t1 = max(ends) if t1 is None else t1
+    grid = np.arange(t0, t1 + period / 2, period)
+
+    out_values, out_mask = [], []
+    for t, v in prepared:
+        gap = max_gap
+        if gap is None:
+            gap = 2.5 * np.median(np.diff(t)) if len(t) > 1 else np.inf
+        for col in v.T:
+            ok = ~np.isnan(col)
+            if dropout_value is not None:
+                ok &= col != dropout_value
+            ts, ys = t[ok], col[ok]
+            if len(ts) < 2:
+                out_values.append(np.full(len(grid), np.nan))
+                out_mask.append(np.zeros(len(grid), dtype=bool))
+                continue
+            right = np.clip(np.searchsorted(ts, grid, side="left"), 1, len(ts) - 1)
+            span = ts[right] - ts[right - 1]
+            mask = (grid >= ts[0]) & (grid <= ts[-1]) & (span <= gap)
+            # a grid point landing exactly on a sample is valid regardless of the gap around it
+            mask |= np.isin(grid, ts)
+            interp = np.interp(grid, ts, ys)
+            interp[~mask] = np.nan
+            out_values.append(interp)
+            out_mask.append(mask)
+
+    return grid, np.column_stack(out_values), np.column_stack(out_mask)
+
+
+def log_times(time_column) -> np.ndarray:
+    """Seconds since midnight for a log's ``Time`` strings (``HH:MM:SS`` or
+    ``HH:MM:SS.mmm``), unwrapping recordings that cross midnight."""
+    secs = np.array([parse_time(str(s)) for s in time_column], dtype=float)
+    wraps = np.concatenate(([0], np.cumsum(np.diff(secs) < 0)))
+    return secs + 86400 * wraps
+
+
+def load_log(path: str):
+    """Read a ``sensor_log_*.csv`` with float ``TimeOfDay`` and ``Elapsed`` columns (seconds).
+
+    ``TimeOfDay`` is comparable across logs recorded on the same day, so it
+    is the column to hand to ``resample`` when aligning several recordings.
+    """
+    import pandas as pd
+
+    df = pd.read_csv(path)
+    df["TimeOfDay"] = log_times(df["Time"])
+    df["Elapsed"] = df["TimeOfDay"] - df["TimeOfDay"].iloc[0]
+    return df
@@ -1,60 +1,45 @@
-import serial
-import struct
+import os
+import sys
 import time
+import serial
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dyp_protocol import saved_baud
+from dyp_registers import RegisterCache, plan_reads
+
+BAUD = saved_baud(9600)
+
+CONFIG_REGS = ["address", "mode", "angle", "denoise"]
 
-def crc16(data: bytes) -> bytes:
-    crc = 0xFFFF
-    for b in data:
-        crc ^= b
-        for _ in range(8):
-            lsb = crc & 0x0001
-            crc >>= 1
-            if lsb:
-                crc ^= 0xA001
-    return crc.to_bytes(2, byteorder='little')
-
-def build_write(addr, reg, value):
-    cmd = struct.pack('>B B H H', addr, 0x06, reg, value)
-    return cmd + crc16(cmd)
-
-def build_read(addr, reg, count):
-    cmd = struct.pack('>B B H H', addr, 0x03, reg, count)
-    return cmd + crc16(cmd)
-
-def send_cmd(ser, cmd, label, expect=8):
-    print(f"[TX] {cmd.hex().upper()} ({label})")
-    ser.write(cmd)
-    ser.flush()
-    time.sleep(0.1)
-    resp = ser.read(expect)
-    print(f"[RX] {resp.hex().upper() if resp else 'NO RESPONSE'}")
-    return resp
+def show(cache, addr, label, max_age=None):
+    vals = cache.get(addr, CONFIG_REGS, max_age)
+    print(f"[RX] {label}: " + "  ".join(f"{n}={v if v is not None else 'NO RESPONSE'}" for n, v in vals.items()))
+    return vals
 
 if __name__ == "__main__":
     port = "COM10"
     addr = 0x01
 
     try:
-        with serial.Serial(port, 9600, timeout=0.5) as ser:
-            # 1. Read address register (baseline)
-            send_cmd(ser, build_read(addr, 0x0200, 1), "Read Address Register")
-
-            # 2. Read config mode register
-            send_cmd(ser, build_read(addr, 0x0207, 1), "Read Config Mode")
-
-            # 3. Attempt write config enable
-            send_cmd(ser, build_write(addr, 0x0207, 0x0001), "Write Config Mode")
-
-            # 4. Re-read config mode
-            send_cmd(ser, build_read(addr, 0x0207, 1), "Re-read Config Mode")
-
-            # 5. Write angle & denoise
-            send_cmd(ser, build_write(addr, 0x0208, 2), "Write Angle Level")
-            send_cmd(ser, build_write(addr, 0x021A, 5), "Write Denoise Level")
-
-            # 6. Re-read angle & denoise
-            send_cmd(ser, build_read(addr, 0x0208, 1), "Read Angle Level")
-            send_cmd(ser, build_read(addr, 0x021A, 1), "Read Denoise Level")
+        with serial.Serial(port, BAUD, timeout=0.5) as ser:
+            cache = RegisterCache(ser)
+            blocks = ", ".join(f"{start:#06x} x{count}" for start, count in plan_reads(CONFIG_REGS))
+            print(f"[PLAN] {blocks}")
+
+            # 1. Read address, config mode, angle & denoise (baseline, one block read)
+            show(cache, addr, "Baseline")
+
+            # 2. Enable config mode, write angle & denoise
+            for name, value, label in [("mode", 0x0001, "Write Config Mode"),
+                                       ("angle", 2, "Write Angle Level"),
+                                       ("denoise", 5, "Write Denoise Level")]:
+                ok = cache.write(addr, name, value)
+                print(f"[TX] {label} -> {'OK' if ok else 'NO ECHO'}")
+                time.sleep(0.1)  # let the sensor commit to EEPROM before the next write
+
+            # 3. Re-read everything from the device, bypassing the cache
+            show(cache, addr, "Re-read", max_age=0)
+            print(f"[INFO] {cache.frames} frames sent")
 
     except Exception as e:
         print(f"[ERROR] {e}")
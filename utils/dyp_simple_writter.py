@@ -1,10 +1,17 @@
 # Minimal GUI Tool for Writing 0x0200 = 0x0001 to DYP Sensor
 import tkinter as tk
 from tkinter import ttk, messagebox
+import os
+import sys
 import serial
 import struct
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dyp_protocol import saved_baud
+
+BAUD = saved_baud(9600)
+
 def modbus_crc16(data):
     crc = 0xFFFF
     for b in data:
@@ -48,7 +55,7 @@ class DYPWriteTest:
             return
 
         try:
-            with serial.Serial(port, 9600, timeout=0.5) as ser:
+            with serial.Serial(port, BAUD, timeout=0.5) as ser:
                 cmd = build_modbus_write(addr, 0x0200, 0x0001)
                 self.log.insert(tk.END, f"[TX] {cmd.hex().upper()}\n")
                 ser.write(cmd)
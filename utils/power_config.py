@@ -1,12 +1,17 @@
 # auto_config_on_powerup.py
 # Automatically sends config write commands right after user confirms sensor has just powered up
 
+import os
+import sys
 import serial
 import struct
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dyp_protocol import saved_baud
+
 PORT = "COM13"   # <- Change to your actual port
-BAUD = 9600
+BAUD = saved_baud(9600)
 ADDR = 0x01       # Sensor address
 
 # --- CRC16 Modbus ---
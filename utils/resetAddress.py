@@ -1,7 +1,14 @@
+import os
+import sys
 import serial
 import struct
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dyp_protocol import saved_baud
+
+BAUD = saved_baud(9600)
+
 def modbus_crc16(data):
     crc = 0xFFFF
     for pos in data:
@@ -19,7 +26,7 @@ def build_modbus_write(addr, reg, value):
 
 def reset_addresses(port='COM12', new_addr=0x01):
     try:
-        with serial.Serial(port, 9600, timeout=0.5) as ser:
+        with serial.Serial(port, BAUD, timeout=0.5) as ser:
             for old_addr in range(1, 5):
                 print(f"--- Attempting to reset sensor at address 0x{old_addr:02X} ---")
                 cmd = build_modbus_write(old_addr, 0x0200, new_addr)
@@ -1,7 +1,14 @@
+import os
+import sys
 import serial
 import struct
 import time
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dyp_protocol import saved_baud
+
+BAUD = saved_baud(9600)
+
 def crc16(data: bytes) -> bytes:
     crc = 0xFFFF
     for b in data:
@@ -36,7 +43,7 @@ if __name__ == "__main__":
     port = "COM13"  # 串口号
     addr = 0x01     # 传感器地址
     try:
-        with serial.Serial(port, 9600, timeout=0.5) as ser:
+        with serial.Serial(port, BAUD, timeout=0.5) as ser:
             # Step 1: Enable config mode
             send_cmd(ser, build_cmd(addr, 0x0207, 0x0001), "Enable Config Mode")
 